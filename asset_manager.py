@@ -0,0 +1,167 @@
+# Asset manager: every image, font and audio file is loaded once and cached.
+#
+# Images are cached per (path, size) already scaled and converted to the
+# display format, so callers never pay for a reload, a rescale or a per-blit
+# pixel format conversion. Files are read either from disk (resolved through
+# resource_path, which also covers PyInstaller's unpack folder) or from a
+# packed asset bundle: one file holding every asset, read with a single open
+# and sliced in memory. Frozen builds ship assets.bundle instead of the
+# assets/ tree, and load_bundle() is all it takes to switch over.
+#
+# Bundle layout (little endian):
+#   header  b"CDAB", version (u8), entry count (u32)
+#   index   per entry: path length (u16), UTF-8 path, offset (u64), size (u64)
+#   data    the files' bytes, offsets relative to the start of the bundle
+import io
+import os
+import struct
+import sys
+
+import pygame
+
+BUNDLE_MAGIC = b"CDAB"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<4sBI")
+BUNDLE_PATH_LENGTH = struct.Struct("<H")
+BUNDLE_ENTRY = struct.Struct("<QQ")
+BUNDLE_NAME = "assets.bundle"
+ASSET_DIR = "assets"
+
+
+class BundleError(Exception):
+    pass
+
+
+def resource_path(relative_path):
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+def bundle_key(path):
+    # Bundle paths always use forward slashes
+    return path.replace(os.sep, "/")
+
+
+def write_bundle(out_path, root=ASSET_DIR):
+    # Pack every file under root into one bundle, keyed by its path relative
+    # to the working directory (e.g. "assets/fonts/PixelOperator8.ttf")
+    paths = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            paths.append(os.path.join(directory, name))
+    paths.sort()
+
+    blobs = []
+    for path in paths:
+        with open(path, "rb") as f:
+            blobs.append(f.read())
+
+    keys = [bundle_key(path).encode("utf-8") for path in paths]
+    index_size = sum(BUNDLE_PATH_LENGTH.size + len(key) + BUNDLE_ENTRY.size for key in keys)
+    offset = BUNDLE_HEADER.size + index_size
+    out = bytearray(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(paths)))
+    for key, blob in zip(keys, blobs):
+        out += BUNDLE_PATH_LENGTH.pack(len(key)) + key + BUNDLE_ENTRY.pack(offset, len(blob))
+        offset += len(blob)
+    for blob in blobs:
+        out += blob
+    with open(out_path, "wb") as f:
+        f.write(out)
+    return paths
+
+
+def read_bundle(data):
+    # Map of path -> memoryview slice of data
+    if len(data) < BUNDLE_HEADER.size:
+        raise BundleError("Truncated asset bundle")
+    magic, version, count = BUNDLE_HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise BundleError("Not a Cloud Dash asset bundle")
+    if version != BUNDLE_VERSION:
+        raise BundleError(f"Unsupported asset bundle version {version}")
+
+    view = memoryview(data)
+    entries = {}
+    pos = BUNDLE_HEADER.size
+    for _ in range(count):
+        (length,) = BUNDLE_PATH_LENGTH.unpack_from(data, pos)
+        pos += BUNDLE_PATH_LENGTH.size
+        key = bytes(data[pos:pos + length]).decode("utf-8")
+        pos += length
+        offset, size = BUNDLE_ENTRY.unpack_from(data, pos)
+        pos += BUNDLE_ENTRY.size
+        if offset + size > len(data):
+            raise BundleError(f"Asset bundle entry {key} is truncated")
+        entries[key] = view[offset:offset + size]
+    return entries
+
+
+class AssetManager:
+    def __init__(self):
+        self.bundle = None  # path -> file bytes when a bundle is loaded
+        self.images = {}
+        self.fonts = {}
+
+    def load_bundle(self, path=None):
+        # Returns False when there is no bundle, so callers fall back to files
+        path = path or resource_path(BUNDLE_NAME)
+        if not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            self.bundle = read_bundle(f.read())
+        return True
+
+    def source(self, path):
+        # What pygame's loaders get: a file object over the bundled bytes, or
+        # the resolved path on disk
+        if self.bundle is not None:
+            data = self.bundle.get(bundle_key(path))
+            if data is not None:
+                return io.BytesIO(data)
+        return resource_path(path)
+
+    def image(self, path, size=None):
+        image = self.images.get((path, size))
+        if image is None:
+            image = self.add_image(path, size, self.load_image(path, size))
+        return image
+
+    def has_image(self, path, size=None):
+        return (path, size) in self.images
+
+    def load_image(self, path, size=None):
+        # Decode and scale only; safe to call from a loader thread
+        image = pygame.image.load(self.source(path), path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        return image
+
+    def add_image(self, path, size, image):
+        # Display format conversion needs a display mode, and happens on the
+        # main thread
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        self.images[(path, size)] = image
+        return image
+
+    def font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(self.source(path), size)
+        return font
+
+
+assets = AssetManager()
+
+
+if __name__ == "__main__":
+    # python asset_manager.py [assets.bundle] packs the assets/ tree
+    out_path = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_NAME
+    packed = write_bundle(out_path)
+    print(f"Packed {len(packed)} assets into {out_path} ({os.path.getsize(out_path)} bytes)")
@@ -0,0 +1,65 @@
+# Theme music decoded once and played from memory, with scheduled fades.
+#
+# pygame.mixer.music streams the MP3 and keeps decoding it on the CPU for as
+# long as it plays. Here the theme is decoded a single time into a Sound (raw
+# PCM in memory, about 32 MB for the three-minute theme) and looped on a
+# reserved mixer channel, so steady-state playback only mixes samples that
+# are already decoded. The decode runs on the startup loader's thread.
+#
+# Volume changes are fades: fade_to() schedules a linear ramp from the current
+# volume to a target over a duration, and update(), called once per frame,
+# moves the channel along it.
+import pygame
+
+from asset_manager import assets
+
+MUSIC_CHANNEL = 0  # Reserved so sound effects can never take it over
+
+
+class Music:
+    def __init__(self, volume):
+        self.sound = None
+        self.channel = None
+        self.playing = False
+        self.volume = volume
+        # Current fade: (start_ms, duration_ms, from_volume, to_volume)
+        self.fade = None
+
+    def load(self, path):
+        # Opens the audio device and decodes the whole track; runs on a
+        # loader thread
+        pygame.mixer.init()
+        pygame.mixer.set_reserved(MUSIC_CHANNEL + 1)
+        self.sound = pygame.mixer.Sound(assets.source(path))
+
+    def play(self):
+        self.channel = pygame.mixer.Channel(MUSIC_CHANNEL)
+        self.channel.set_volume(self.volume)
+        self.channel.play(self.sound, loops=-1)
+        self.playing = True
+
+    def fade_to(self, volume, duration_ms, now_ms):
+        # A new fade starts from wherever the previous one had got to
+        if duration_ms <= 0:
+            self.fade = None
+            self.set_volume(volume)
+        else:
+            self.fade = (now_ms, duration_ms, self.volume, volume)
+
+    def update(self, now_ms):
+        if self.fade is None:
+            return
+        start, duration, from_volume, to_volume = self.fade
+        progress = (now_ms - start) / duration
+        if progress >= 1:
+            self.fade = None
+            progress = 1
+        self.set_volume(from_volume + (to_volume - from_volume) * progress)
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.channel is not None:
+            self.channel.set_volume(volume)
+
+    def target_volume(self):
+        return self.fade[3] if self.fade else self.volume
@@ -0,0 +1,360 @@
+# Vectorized batch simulation: N independent Cloud Dash games stepped in lockstep.
+#
+# Player and obstacle state are struct-of-arrays NumPy buffers, and one step()
+# advances every game with array operations. The rules mirror the classic
+# collision rules in simulation.py exactly (Player.update, Obstacle.update and
+# Simulation.step); game i of BatchSimulation(seeds=...) stays bit-for-bit in
+# sync with Simulation(seeds[i]) given the same inputs.
+#
+# Obstacles and coins live in per-game ring buffers kept in spawn (x) order.
+# Removing one from the middle (shield break, pickup) only clears its alive
+# flag; the ring head skips dead slots. Spawning and coin placement are rare
+# and draw from each game's own random.Random, so they run per game in Python.
+#
+# Requires numpy.
+import random
+
+import numpy as np
+
+from constants import *
+
+# Obstacle dimensions by type, as in Obstacle.spawn
+OBSTACLE_WIDTHS = np.array([40, 80], dtype=np.int32)
+OBSTACLE_HEIGHTS = np.array([40, 30], dtype=np.int32)
+OBSTACLE_TYPES = [OBSTACLE_TRIANGLE, OBSTACLE_PLATFORM]
+
+PLAYER_GROUND_Y = GROUND_Y - PLAYER_SIZE
+MAX_OBSTACLES = 8
+MAX_COINS = 4
+
+
+def points_in_triangles(px, py, x, width, top):
+    # Vectorized Obstacle.point_in_triangle edge-function test
+    x1, y1 = x, GROUND_Y
+    x2, y2 = x + width, GROUND_Y
+    x3, y3 = x + width // 2, top
+    d1 = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+    d2 = (x3 - x2) * (py - y2) - (y3 - y2) * (px - x2)
+    d3 = (x1 - x3) * (py - y3) - (y1 - y3) * (px - x3)
+    has_negative = (d1 < 0) | (d2 < 0) | (d3 < 0)
+    has_positive = (d1 > 0) | (d2 > 0) | (d3 > 0)
+    return ~(has_negative & has_positive)
+
+
+class BatchSimulation:
+    def __init__(self, n, seeds=None, max_obstacles=MAX_OBSTACLES, max_coins=MAX_COINS):
+        if seeds is None:
+            seeds = [random.randrange(2 ** 63) for _ in range(n)]
+        if len(seeds) != n:
+            raise ValueError(f"Expected {n} seeds, got {len(seeds)}")
+        self.n = n
+        self.seeds = list(seeds)
+        self.rngs = [random.Random(seed) for seed in self.seeds]
+        self.rows = np.arange(n)
+        self.tick = np.zeros(n, dtype=np.int64)
+
+        # Player state
+        self.player_image = np.zeros(n, dtype=np.int8)  # Index into PLAYER_IMAGES
+        self.player_y = np.zeros(n, dtype=np.int32)
+        self.prev_y = np.zeros(n, dtype=np.int32)
+        self.velocity_y = np.zeros(n, dtype=np.int32)
+        self.is_jumping = np.zeros(n, dtype=bool)
+        self.jump_count = np.zeros(n, dtype=np.int32)
+        self.rotation = np.zeros(n, dtype=np.int32)
+        self.prev_rotation = np.zeros(n, dtype=np.int32)
+        self.target_rotation = np.zeros(n, dtype=np.int32)
+        self.boost_active = np.zeros(n, dtype=bool)
+        self.boost_tick = np.zeros(n, dtype=np.int64)
+        self.shield_active = np.zeros(n, dtype=bool)
+        self.score_multiplier = np.ones(n, dtype=np.int32)
+
+        # Game state
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_active = np.zeros(n, dtype=bool)
+        self.last_obstacle_tick = np.zeros(n, dtype=np.int64)
+        self.last_boost_tick = np.zeros(n, dtype=np.int64)
+
+        # Obstacles: ring buffers of max_obstacles slots per game
+        shape = (n, max_obstacles)
+        self.max_obstacles = max_obstacles
+        self.obstacle_x = np.zeros(shape, dtype=np.int32)
+        self.obstacle_prev_x = np.zeros(shape, dtype=np.int32)
+        self.obstacle_type = np.zeros(shape, dtype=np.int8)
+        self.obstacle_width = np.zeros(shape, dtype=np.int32)
+        self.obstacle_height = np.zeros(shape, dtype=np.int32)
+        self.obstacle_color = np.zeros(shape, dtype=np.int8)  # Index into NEON_COLORS
+        self.obstacle_passed = np.zeros(shape, dtype=bool)
+        self.obstacle_alive = np.zeros(shape, dtype=bool)
+        self.obstacle_head = np.zeros(n, dtype=np.int64)
+        self.obstacle_tail = np.zeros(n, dtype=np.int64)
+
+        # Coins: ring buffers of max_coins slots per game
+        shape = (n, max_coins)
+        self.max_coins = max_coins
+        self.coin_x = np.zeros(shape, dtype=np.int32)
+        self.coin_prev_x = np.zeros(shape, dtype=np.int32)
+        self.coin_y = np.zeros(shape, dtype=np.int32)
+        self.coin_angle = np.zeros(shape, dtype=np.int32)
+        self.coin_alive = np.zeros(shape, dtype=bool)
+        self.coin_head = np.zeros(n, dtype=np.int64)
+        self.coin_tail = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+        # Fresh games wait on the start menu until start() is called
+        self.game_active[:] = False
+
+    def select(self, mask):
+        # Row indices for an optional boolean mask (None means every game)
+        if mask is None:
+            return self.rows
+        return np.flatnonzero(mask)
+
+    def reset(self, mask=None):
+        rows = self.select(mask)
+        for i in rows:
+            self.player_image[i] = PLAYER_IMAGES.index(self.rngs[i].choice(PLAYER_IMAGES))
+        self.player_y[rows] = PLAYER_GROUND_Y
+        self.prev_y[rows] = PLAYER_GROUND_Y
+        self.velocity_y[rows] = 0
+        self.is_jumping[rows] = False
+        self.jump_count[rows] = 0
+        self.rotation[rows] = 0
+        self.prev_rotation[rows] = 0
+        self.target_rotation[rows] = 0
+        self.boost_active[rows] = False
+        self.boost_tick[rows] = 0
+        self.shield_active[rows] = False
+        self.score_multiplier[rows] = 1
+
+        self.score[rows] = 0
+        self.game_over[rows] = False
+        self.game_active[rows] = True
+        self.last_obstacle_tick[rows] = self.tick[rows]
+        self.last_boost_tick[rows] = self.tick[rows]
+
+        self.obstacle_alive[rows] = False
+        self.obstacle_head[rows] = 0
+        self.obstacle_tail[rows] = 0
+        self.coin_alive[rows] = False
+        self.coin_head[rows] = 0
+        self.coin_tail[rows] = 0
+
+    def start(self, mask=None):
+        rows = self.select(mask)
+        startable = rows[~self.game_active[rows] & ~self.game_over[rows]]
+        self.game_active[startable] = True
+
+    def step(self, jump=None):
+        # jump: optional bool array of length n
+        self.tick += 1
+        tick = self.tick
+
+        if jump is not None:
+            self.apply_jumps(np.asarray(jump, dtype=bool))
+
+        running = ~self.game_over
+        self.update_players(running)
+
+        # Only update game elements if game is active
+        active = self.game_active.copy()
+        if not active.any():
+            return
+        speed = np.where(self.boost_active, BOOST_SPEED, GAME_SPEED).astype(np.int32)
+
+        # Generate obstacles and coins (rare, per game RNG)
+        for i in np.flatnonzero(active & (tick - self.last_obstacle_tick > OBSTACLE_FREQUENCY_TICKS)):
+            self.spawn_obstacle(i)
+        for i in np.flatnonzero(active & (tick - self.last_boost_tick > BOOST_FREQUENCY_TICKS)):
+            self.spawn_coin(i)
+
+        self.update_obstacles(active, speed)
+
+        # Update coins for games still active after collisions
+        self.update_coins(self.game_active, speed)
+
+    def apply_jumps(self, jump):
+        # Player.jump, only if game is active
+        j = jump & self.game_active & (~self.is_jumping | (self.jump_count < 2))
+        self.velocity_y[j] = -JUMP_FORCE
+        self.is_jumping[j] = True
+        self.jump_count[j] += 1
+        target = (self.target_rotation[j] - 90) % 360
+        self.target_rotation[j] = np.where(target > 0, target - 360, target)
+
+    def update_players(self, running):
+        # Player.update for every game that is not over
+        self.prev_y[running] = self.player_y[running]
+        self.prev_rotation[running] = self.rotation[running]
+        self.velocity_y[running] += GRAVITY
+        self.player_y[running] += self.velocity_y[running]
+
+        # Smooth rotation animation - always rotate clockwise
+        rotating = running & (self.rotation != self.target_rotation)
+        self.rotation[rotating] -= ROTATION_SPEED
+        overshot = rotating & (self.rotation <= self.target_rotation)
+        self.rotation[overshot] = self.target_rotation[overshot]
+
+        # Check if player is on the ground
+        grounded = running & (self.player_y >= PLAYER_GROUND_Y)
+        self.player_y[grounded] = PLAYER_GROUND_Y
+        self.velocity_y[grounded] = 0
+        self.is_jumping[grounded] = False
+        self.jump_count[grounded] = 0
+
+        # Handle boost expiry
+        expired = running & self.boost_active & (self.tick - self.boost_tick > BOOST_DURATION_TICKS)
+        self.boost_active[expired] = False
+        self.shield_active[expired] = False
+        self.score_multiplier[expired] = 1
+
+    def live_obstacle_slots(self, i):
+        # Ring slots of game i's live obstacles, in list (x) order
+        return [slot % self.max_obstacles
+                for slot in range(self.obstacle_head[i], self.obstacle_tail[i])
+                if self.obstacle_alive[i, slot % self.max_obstacles]]
+
+    def spawn_obstacle(self, i):
+        if self.obstacle_tail[i] - self.obstacle_head[i] >= self.max_obstacles:
+            raise RuntimeError(f"Game {i} exceeded max_obstacles={self.max_obstacles}")
+        rng = self.rngs[i]
+        obstacle_type = rng.choice(OBSTACLE_TYPES)
+        color = rng.choice(NEON_COLORS)
+        slot = self.obstacle_tail[i] % self.max_obstacles
+        self.obstacle_x[i, slot] = SCREEN_WIDTH
+        self.obstacle_prev_x[i, slot] = SCREEN_WIDTH
+        self.obstacle_type[i, slot] = obstacle_type
+        self.obstacle_width[i, slot] = OBSTACLE_WIDTHS[obstacle_type]
+        self.obstacle_height[i, slot] = OBSTACLE_HEIGHTS[obstacle_type]
+        self.obstacle_color[i, slot] = NEON_COLORS.index(color)
+        self.obstacle_passed[i, slot] = False
+        self.obstacle_alive[i, slot] = True
+        self.obstacle_tail[i] += 1
+        self.last_obstacle_tick[i] = self.tick[i]
+
+    def spawn_coin(self, i):
+        # Same placement rules as Simulation.spawn_boost_item
+        coin_x = SCREEN_WIDTH
+        coin_y = self.rngs[i].choice(COIN_POSITIONS)
+        for slot in self.live_obstacle_slots(i):
+            x = int(self.obstacle_x[i, slot])
+            width = int(self.obstacle_width[i, slot])
+            height = int(self.obstacle_height[i, slot])
+            # Check if any obstacle is too close to the coin position
+            if abs(x - coin_x) < COIN_MIN_DISTANCE:
+                break
+            # Project obstacle position to where it would be when coin arrives
+            x += COIN_MIN_DISTANCE
+            if (x < coin_x + COIN_SIZE and coin_x < x + width
+                    and GROUND_Y - height < coin_y + COIN_SIZE and coin_y < GROUND_Y):
+                break
+        else:
+            if self.coin_tail[i] - self.coin_head[i] >= self.max_coins:
+                raise RuntimeError(f"Game {i} exceeded max_coins={self.max_coins}")
+            slot = self.coin_tail[i] % self.max_coins
+            self.coin_x[i, slot] = coin_x
+            self.coin_prev_x[i, slot] = coin_x
+            self.coin_y[i, slot] = coin_y
+            self.coin_angle[i, slot] = 0
+            self.coin_alive[i, slot] = True
+            self.coin_tail[i] += 1
+            self.last_boost_tick[i] = self.tick[i]
+            return
+
+        # Delay coin generation by a bit to avoid obstacle
+        self.last_boost_tick[i] = self.tick[i] - (BOOST_FREQUENCY_TICKS - COIN_RETRY_DELAY_TICKS)
+
+    def update_obstacles(self, active, speed):
+        # Obstacle.update: scroll every live obstacle of active games
+        moving = self.obstacle_alive & active[:, None]
+        self.obstacle_prev_x[moving] = self.obstacle_x[moving]
+        self.obstacle_x -= np.where(moving, speed[:, None], 0).astype(np.int32)
+
+        # Walk each game's obstacle list in order. Positions are processed one
+        # at a time across all games, because landing, shield loss and death
+        # change what later obstacles in the same list see.
+        rows = self.rows
+        used = self.obstacle_tail - self.obstacle_head
+        for j in range(int(used[active].max(initial=0))):
+            slot = (self.obstacle_head + j) % self.max_obstacles
+            valid = active & (j < used) & self.obstacle_alive[rows, slot]
+            if not valid.any():
+                continue
+            x = self.obstacle_x[rows, slot]
+            width = self.obstacle_width[rows, slot]
+            right = x + width
+            top = GROUND_Y - self.obstacle_height[rows, slot]
+
+            # Check if player passed the obstacle
+            passed = valid & ~self.obstacle_passed[rows, slot] & (right < PLAYER_X)
+            self.score[passed] += self.score_multiplier[passed]
+            self.obstacle_passed[rows[passed], slot[passed]] = True
+
+            # Remove obstacles that are off-screen
+            culled = valid & (right < 0)
+            self.obstacle_alive[rows[culled], slot[culled]] = False
+            valid &= ~culled
+
+            # Rect overlap, then the two inset bottom corners for triangles
+            player_y = self.player_y
+            overlap = (valid & (x < PLAYER_X + PLAYER_SIZE) & (PLAYER_X < right)
+                       & (top < player_y + PLAYER_SIZE) & (player_y < GROUND_Y))
+            if not overlap.any():
+                continue
+            corner_y = player_y + PLAYER_SIZE - 5
+            platform = self.obstacle_type[rows, slot] == OBSTACLE_PLATFORM
+            hit = overlap & (platform
+                             | points_in_triangles(PLAYER_X + 5, corner_y, x, width, top)
+                             | points_in_triangles(PLAYER_X + PLAYER_SIZE - 5, corner_y, x, width, top))
+
+            # Land on platforms from above while falling
+            landing = (hit & platform & (player_y + PLAYER_SIZE <= top + 10)
+                       & (self.velocity_y > 0))
+            self.player_y[landing] = top[landing] - PLAYER_SIZE
+            self.velocity_y[landing] = 0
+            self.is_jumping[landing] = False
+            self.jump_count[landing] = 0
+
+            # Anything else costs the shield, or the game
+            hit &= ~landing
+            shield_break = hit & self.shield_active
+            death = hit & ~self.shield_active
+            self.shield_active[shield_break] = False
+            self.obstacle_alive[rows[shield_break], slot[shield_break]] = False
+            self.game_over[death] = True
+            self.game_active[death] = False
+
+        self.obstacle_head = self.advance_head(self.obstacle_head, self.obstacle_tail,
+                                               self.obstacle_alive, self.max_obstacles)
+
+    def update_coins(self, active, speed):
+        if not active.any():
+            return
+        moving = self.coin_alive & active[:, None]
+        self.coin_prev_x[moving] = self.coin_x[moving]
+        self.coin_x -= np.where(moving, speed[:, None], 0).astype(np.int32)
+        self.coin_angle[moving] = (self.coin_angle[moving] + 5) % 360
+
+        # Check if player collected a coin
+        player_y = self.player_y[:, None]
+        collected = (moving & (PLAYER_X < self.coin_x + COIN_SIZE) & (self.coin_x < PLAYER_X + PLAYER_SIZE)
+                     & (player_y < self.coin_y + COIN_SIZE) & (self.coin_y < player_y + PLAYER_SIZE))
+        boosted = collected.any(axis=1)
+        self.boost_active[boosted] = True
+        self.shield_active[boosted] = True
+        self.boost_tick[boosted] = self.tick[boosted]
+        self.score_multiplier[boosted] = 2
+
+        # Remove coins that are off-screen or collected
+        self.coin_alive &= ~(moving & (collected | (self.coin_x + COIN_SIZE < 0)))
+        self.coin_head = self.advance_head(self.coin_head, self.coin_tail, self.coin_alive, self.max_coins)
+
+    def advance_head(self, head, tail, alive, capacity):
+        # Skip dead slots at the front of each ring
+        rows = self.rows
+        for _ in range(capacity):
+            dead = (head < tail) & ~alive[rows, head % capacity]
+            if not dead.any():
+                break
+            head = head + dead
+        return head
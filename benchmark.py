@@ -0,0 +1,280 @@
+# Headless benchmark suite with scripted scenarios and regression checks.
+#
+#   python benchmark.py --output results.json
+#   python benchmark.py --save-baseline baseline.json
+#   python benchmark.py --baseline baseline.json --threshold 0.15
+#
+# Runs under SDL's dummy video and audio drivers, so no window or sound
+# device is needed. Each scenario drives a seeded Simulation with scripted
+# input and is measured three ways:
+#
+#   steps_per_sec         simulation ticks per second, no rendering
+#   draw_ms / draw_p95_ms Renderer.draw() time per frame (full redraw)
+#   alloc_bytes_per_frame peak Python heap growth inside a step + draw, as
+#                         seen by tracemalloc (temporary objects included)
+#   net_blocks_per_frame  allocated blocks still alive after each frame,
+#                         which should stay near zero
+#
+# plus startup_ms, the wall time for a fresh interpreter to import the game,
+# build a Game and present the first frame.
+#
+# Timings are the median of several repeats, each on a fresh simulation, so a
+# single run that catches a busy moment doesn't move the result.
+#
+# With --baseline, every metric is compared against the saved results and the
+# run exits with status 1 if any is worse by more than the threshold (a
+# fraction: 0.15 allows 15%). --quick runs fewer and shorter repeats, which
+# are noisier, so its default threshold is wider.
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from constants import *
+from simulation import Simulation
+
+BENCHMARK_SEED = 1234
+DEFAULT_THRESHOLD = 0.15
+QUICK_THRESHOLD = 0.35
+REPEATS = 5  # Median of this many timing runs per metric
+QUICK_REPEATS = 3
+STARTUP_RUNS = 3
+STRESS_OBSTACLE_TICKS = 12  # Extra obstacle every 12 ticks in stress mode
+STRESS_COIN_TICKS = 20
+
+# Metrics where a larger value is better; every other metric is a cost
+HIGHER_IS_BETTER = {"steps_per_sec"}
+# Metrics close to zero are compared with this absolute slack instead of
+# a pure ratio, so noise around zero doesn't fail the run
+ABSOLUTE_SLACK = {"net_blocks_per_frame": 1.0, "alloc_bytes_per_frame": 256.0}
+
+
+def autopilot(sim):
+    # Jump when the next obstacle is about to reach the player
+    player = sim.player
+    for obstacle in sim.obstacles:
+        distance = obstacle.rect.x - player.rect.right
+        if distance >= 0:
+            return distance < 30 and not player.is_jumping
+    return False
+
+
+def idle_script(sim):
+    # Start menu: never started, nothing scrolls
+    return False
+
+
+def normal_script(sim):
+    if sim.game_over:
+        sim.reset()
+    return autopilot(sim)
+
+
+def boost_script(sim):
+    # Boost is re-armed as soon as it runs out, so play is at double speed
+    if sim.game_over:
+        sim.reset()
+    if not sim.player.boost_active:
+        sim.player.activate_boost(sim.tick)
+    return autopilot(sim)
+
+
+def stress_script(sim):
+    # A permanent shield and extra spawns keep the screen full
+    if sim.game_over:
+        sim.reset()
+    sim.player.activate_boost(sim.tick)
+    if sim.tick % STRESS_OBSTACLE_TICKS == 0:
+        sim.obstacles.append(sim.obstacle_pool.acquire(SCREEN_WIDTH, sim.rng))
+    if sim.tick % STRESS_COIN_TICKS == 0:
+        sim.boost_items.append(sim.boost_pool.acquire(SCREEN_WIDTH, sim.rng.choice(COIN_POSITIONS)))
+    return autopilot(sim)
+
+
+# name -> (script, whether the game is started)
+SCENARIOS = {
+    "idle_menu": (idle_script, False),
+    "normal": (normal_script, True),
+    "boost_heavy": (boost_script, True),
+    "stress": (stress_script, True),
+}
+
+
+def make_simulation(started):
+    sim = Simulation(BENCHMARK_SEED, precise_collision=True)
+    if started:
+        sim.start()
+    return sim
+
+
+def warm_up(sim, script, ticks):
+    for _ in range(ticks):
+        sim.step(script(sim))
+
+
+def measure_steps(script, started, ticks):
+    sim = make_simulation(started)
+    warm_up(sim, script, TICK_RATE)
+    step = sim.step
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step(script(sim))
+    return ticks / (time.perf_counter() - start)
+
+
+def measure_draw(script, started, frames, renderer, surface):
+    sim = make_simulation(started)
+    warm_up(sim, script, TICK_RATE)
+    times = []
+    for _ in range(frames):
+        sim.step(script(sim))
+        start = time.perf_counter()
+        renderer.draw(surface, sim)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return sum(times) / frames * 1000, times[int(frames * 0.95)] * 1000
+
+
+def measure_allocations(script, started, frames, renderer, surface):
+    sim = make_simulation(started)
+    warm_up(sim, script, TICK_RATE)
+    # One untraced pass first so caches are filled before counting
+    for _ in range(frames):
+        sim.step(script(sim))
+        renderer.draw(surface, sim)
+
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        sim.step(script(sim))
+        renderer.draw(surface, sim)
+        peak_total += tracemalloc.get_traced_memory()[1] - before
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    return peak_total / frames, (blocks_after - blocks_before) / frames
+
+
+def measure_startup(runs=STARTUP_RUNS):
+    # Best of a few fresh interpreters, from spawn to the first presented frame
+    code = ("import os, geometry_dash; game = geometry_dash.Game(); "
+            "game.draw(); game.present(); os._exit(0)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=here, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def run(ticks=20000, frames=600, scenarios=None, repeats=REPEATS):
+    from geometry_dash import Renderer
+
+    renderer = Renderer()
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    results = {}
+    for name in scenarios or SCENARIOS:
+        script, started = SCENARIOS[name]
+        draws = [measure_draw(script, started, frames, renderer, surface) for _ in range(repeats)]
+        alloc_bytes, net_blocks = measure_allocations(script, started, frames, renderer, surface)
+        results[name] = {
+            "steps_per_sec": median([measure_steps(script, started, ticks) for _ in range(repeats)]),
+            "draw_ms": median([draw[0] for draw in draws]),
+            "draw_p95_ms": median([draw[1] for draw in draws]),
+            "alloc_bytes_per_frame": alloc_bytes,
+            "net_blocks_per_frame": net_blocks,
+        }
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "startup_ms": measure_startup(),
+        "scenarios": results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # List of human-readable regressions; empty when everything is within
+    # the threshold
+    pairs = [("startup_ms", results["startup_ms"], baseline.get("startup_ms"))]
+    for name, metrics in results["scenarios"].items():
+        saved = baseline.get("scenarios", {}).get(name, {})
+        for metric, value in metrics.items():
+            pairs.append((f"{name}.{metric}", value, saved.get(metric)))
+
+    regressions = []
+    for label, value, saved in pairs:
+        if saved is None:
+            continue
+        metric = label.rsplit(".", 1)[-1]
+        slack = ABSOLUTE_SLACK.get(metric, 0.0)
+        if metric in HIGHER_IS_BETTER:
+            worse = value < saved * (1 - threshold) - slack
+        else:
+            worse = value > saved * (1 + threshold) + slack
+        if worse:
+            regressions.append(f"{label}: {value:.3f} vs baseline {saved:.3f}")
+    return regressions
+
+
+def print_results(results):
+    print(f"startup: {results['startup_ms']:.1f} ms")
+    for name, metrics in results["scenarios"].items():
+        print(f"{name:12s} {metrics['steps_per_sec']:10.0f} steps/s  "
+              f"draw {metrics['draw_ms']:.3f} ms (p95 {metrics['draw_p95_ms']:.3f})  "
+              f"alloc {metrics['alloc_bytes_per_frame']:.0f} B/frame  "
+              f"net {metrics['net_blocks_per_frame']:.2f} blocks/frame")
+
+
+if __name__ == "__main__":
+    def option(name, default=None):
+        if name in sys.argv:
+            return sys.argv[sys.argv.index(name) + 1]
+        return default
+
+    # --quick runs fewer, shorter measurements for a smoke check
+    quick = "--quick" in sys.argv
+    if quick:
+        results = run(ticks=4000, frames=200, repeats=QUICK_REPEATS)
+    else:
+        results = run()
+    print_results(results)
+
+    for path in (option("--output"), option("--save-baseline")):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+    baseline_path = option("--baseline")
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        default_threshold = QUICK_THRESHOLD if quick else DEFAULT_THRESHOLD
+        regressions = compare(results, baseline, float(option("--threshold", default_threshold)))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {baseline_path}")
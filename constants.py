@@ -0,0 +1,91 @@
+# Shared constants for the Cloud Dash simulation core and the pygame front end.
+# Nothing in here touches the display, the mixer or the clock.
+
+# Screen / world dimensions
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 400
+GROUND_HEIGHT = 50
+GROUND_Y = SCREEN_HEIGHT - GROUND_HEIGHT
+
+# Physics
+GRAVITY = 1
+JUMP_FORCE = 15
+GAME_SPEED = 5
+BOOST_SPEED = 10  # Speed when boost is active
+ROTATION_SPEED = 10  # Degrees per frame for rotation animation
+# The player only ever rotates in ROTATION_SPEED steps, so this many frames
+# (sprites, masks, ghost poses) cover a full turn
+ROTATION_STEPS = 360 // ROTATION_SPEED
+TRIANGLE_WIDTH = 150  # 300% of original 50
+PLATFORM_WIDTH = 240  # 300% of original 80
+PLATFORM_HEIGHT = 120  # 300% of original 40
+OBSTACLE_MIN_HEIGHT = 50  # Base height before scaling
+OBSTACLE_MAX_HEIGHT = 100  # Base height before scaling
+OBSTACLE_FREQUENCY = 1500  # milliseconds
+BOOST_FREQUENCY = 5000  # milliseconds
+BOOST_DURATION = 3000  # milliseconds
+COIN_RETRY_DELAY = 2000  # milliseconds to wait before retrying a blocked coin
+
+# Fixed simulation timestep - the simulation only ever counts ticks
+TICK_RATE = 60  # Simulation ticks per second
+TICK_MS = 1000 / TICK_RATE
+MAX_TICKS_PER_FRAME = 5  # Drop time rather than spiral after a long hitch
+RENDER_FPS = 60  # Default render cap, independent of TICK_RATE
+
+def ms_to_ticks(ms):
+    return ms * TICK_RATE // 1000
+
+OBSTACLE_FREQUENCY_TICKS = ms_to_ticks(OBSTACLE_FREQUENCY)
+BOOST_FREQUENCY_TICKS = ms_to_ticks(BOOST_FREQUENCY)
+BOOST_DURATION_TICKS = ms_to_ticks(BOOST_DURATION)
+COIN_RETRY_DELAY_TICKS = ms_to_ticks(COIN_RETRY_DELAY)
+
+# Player
+PLAYER_SIZE = 40
+PLAYER_X = 100
+PLAYER_IMAGES = ["assets/images/character/pixel.png", "assets/images/character/pixel_1.png"]
+
+# Coins
+COIN_SIZE = 60
+COIN_MIN_DISTANCE = 200  # Minimum distance between coin and obstacles
+COIN_POSITIONS = [
+    GROUND_Y - 70,  # Low position
+    GROUND_Y - 150  # High position
+]
+
+# Audio settings - direct values to avoid any issues
+MUSIC_NORMAL_VOLUME = 1.0  # 100% volume during active gameplay
+MUSIC_IDLE_VOLUME = 0.3    # 30% volume during idle state
+MUSIC_MENU_VOLUME = 0.3    # 10% volume for menu/game over states
+MUSIC_FADE_IN_MS = 250     # Fade up to a louder state
+MUSIC_FADE_OUT_MS = 1000   # Slower fade down to idle, menu or death volume
+
+# Obstacle types
+OBSTACLE_TRIANGLE = 0
+OBSTACLE_PLATFORM = 1
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+GRAY = (100, 100, 100)
+
+# Neon Colors
+NEON_PINK = (255, 20, 147)
+NEON_GREEN = (57, 255, 20)
+NEON_BLUE = (0, 191, 255)
+NEON_PURPLE = (138, 43, 226)
+NEON_ORANGE = (255, 153, 0)
+NEON_BACKGROUND = (10, 10, 40)
+NEON_COLORS = [NEON_PINK, NEON_GREEN, NEON_BLUE, NEON_PURPLE, NEON_ORANGE]
+
+# Simulation events reported through Simulation.events
+EVENT_JUMP = "jump"
+EVENT_OBSTACLE_SPAWN = "obstacle_spawn"
+EVENT_COIN_SPAWN = "coin_spawn"
+EVENT_COIN_PICKUP = "coin_pickup"
+EVENT_SHIELD_BREAK = "shield_break"
+EVENT_DEATH = "death"
+EVENT_LEVEL_COMPLETE = "level_complete"
@@ -0,0 +1,144 @@
+# Gym-style reset/step environment around the Cloud Dash simulation.
+#
+#   env = CloudDashEnv(seed=0)
+#   obs = env.reset()
+#   obs, reward, done, info = env.step(ACTION_JUMP)
+#
+# The reward is the score gained during the step and done is game over.
+# Observations come in two forms:
+#
+#   "features"  float32 vector: player y, velocity_y, jump_count, boost and
+#               shield flags, then type, distance and height of the next k
+#               obstacles ahead of the player (type -1 when there is none)
+#   "pixels"    uint8 (height, width, 3) RGB frame of the rendered game,
+#               optionally at a reduced resolution
+#
+# The returned array is a buffer the environment owns and overwrites on the
+# next step, so copy it if you keep it, and don't write into it: at full
+# resolution the next frame only repaints what moved. The game is drawn
+# straight into a Surface created over that NumPy buffer with
+# pygame.image.frombuffer, so there is no per-step copy or conversion, and
+# unlike a surfarray.pixels3d view it doesn't lock a surface while the caller
+# holds the array. At a reduced resolution the world is drawn at that size
+# through a quality.ScaledTarget, so smaller observations are cheaper to
+# render; they leave out the HUD.
+#
+# Feature mode never touches pygame's display; pixel mode imports the renderer
+# on demand and defaults SDL to its dummy video and audio drivers.
+import os
+
+import numpy as np
+
+from constants import *
+from simulation import Simulation
+
+ACTION_NONE = 0
+ACTION_JUMP = 1
+NUM_ACTIONS = 2
+
+OBSERVATION_FEATURES = "features"
+OBSERVATION_PIXELS = "pixels"
+
+PLAYER_FEATURES = 5
+OBSTACLE_FEATURES = 3
+NO_OBSTACLE = (-1, SCREEN_WIDTH, 0)
+
+
+class CloudDashEnv:
+    def __init__(self, seed=None, observation=OBSERVATION_FEATURES, lookahead=3,
+                 resolution=(SCREEN_WIDTH, SCREEN_HEIGHT), frame_skip=1, precise_collision=False):
+        if observation not in (OBSERVATION_FEATURES, OBSERVATION_PIXELS):
+            raise ValueError(f"Unknown observation type {observation!r}")
+        self.observation = observation
+        self.lookahead = lookahead
+        self.frame_skip = frame_skip
+        self.precise_collision = precise_collision
+        self.sim = Simulation(seed, precise_collision)
+
+        if observation == OBSERVATION_FEATURES:
+            self.observation_shape = (PLAYER_FEATURES + OBSTACLE_FEATURES * lookahead,)
+            self.features = np.zeros(self.observation_shape, dtype=np.float32)
+        else:
+            width, height = resolution
+            self.observation_shape = (height, width, 3)
+            self.setup_pixels(width, height)
+
+    def setup_pixels(self, width, height):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import pygame
+        from geometry_dash import Renderer
+        from quality import ScaledTarget
+
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        # Drawing into this Surface writes straight into self.pixels
+        self.pixel_surface = pygame.image.frombuffer(self.pixels, (width, height), "RGB")
+        if (width, height) == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            # Dirty rectangle mode only repaints what moved since the
+            # previous step
+            self.renderer = Renderer(dirty_rects=True)
+            self.target = self.pixel_surface
+        else:
+            # Reduced resolution: the world is drawn at observation size
+            # from sprites scaled once, without the HUD, whose text would be
+            # unreadable at that size
+            self.renderer = Renderer()
+            self.target = ScaledTarget((width, height), self.pixel_surface)
+
+    def reset(self, seed=None):
+        # A new seed starts a fresh run; otherwise the game's RNG carries on
+        if seed is not None:
+            self.sim = Simulation(seed, self.precise_collision)
+        else:
+            self.sim.reset()
+        self.sim.start()
+        return self.observe()
+
+    def step(self, action):
+        sim = self.sim
+        score = sim.score
+        jump = action == ACTION_JUMP
+        for _ in range(self.frame_skip):
+            sim.step(jump)
+            jump = False
+            if sim.game_over:
+                break
+        info = {"score": sim.score, "tick": sim.tick}
+        return self.observe(), sim.score - score, sim.game_over, info
+
+    def observe(self):
+        if self.observation == OBSERVATION_FEATURES:
+            return self.observe_features()
+        return self.observe_pixels()
+
+    def observe_features(self):
+        sim = self.sim
+        player = sim.player
+        features = self.features
+        features[0] = player.rect.y
+        features[1] = player.velocity_y
+        features[2] = player.jump_count
+        features[3] = player.boost_active
+        features[4] = player.shield_active
+
+        # Next obstacles not yet passed, in x order
+        index = PLAYER_FEATURES
+        end = len(features)
+        for obstacle in sim.obstacles:
+            if index == end:
+                break
+            if obstacle.rect.right < player.rect.left:
+                continue
+            features[index] = obstacle.type
+            features[index + 1] = obstacle.rect.x - player.rect.right
+            features[index + 2] = obstacle.height
+            index += OBSTACLE_FEATURES
+        while index < end:
+            features[index:index + OBSTACLE_FEATURES] = NO_OBSTACLE
+            index += OBSTACLE_FEATURES
+        return features
+
+    def observe_pixels(self):
+        self.renderer.draw(self.target, self.sim, hud=self.target is self.pixel_surface)
+        self.renderer.present_offscreen()
+        return self.pixels
@@ -1,608 +1,671 @@
+# Imported first so the startup report's clock also covers importing pygame
+from startup import startup_report, BackgroundLoader
+
 import pygame
-import sys
-import random
-import math
 import os
+import sys
+import time
+
+from constants import *
+from simulation import Simulation
+from replay import InputRecorder
+from timestep import FixedTimestep, lerp, lerp_angle
+from sprites import *
+from text_cache import text_cache
+from profiler import FrameProfiler
+from asset_manager import assets
+from audio import Music
+from telemetry import Telemetry
+from level import LevelFile
+from ghosts import load_ghosts, make_ghost_image
+from quality import *
+from leaderboard import Leaderboard
+startup_report.milestone("imports")
+
+# Initialize only what the first frame needs; the mixer is started by the
+# audio loader in the background
+with startup_report.stage("display"):
+    pygame.display.init()
+    pygame.font.init()
 
-def resource_path(relative_path):
+    # Set up the display
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Cloud Dash")
+    clock = pygame.time.Clock()
+
+with startup_report.stage("asset bundle"):
+    # Frozen builds ship a packed assets.bundle; otherwise files come from assets/
+    assets.load_bundle()
+
+# Set by set_fonts(); text is skipped until the fonts are ready
+FONT_SMALL = FONT_MEDIUM = FONT_LARGE = None
+
+def load_fonts():
     try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    
-    return os.path.join(base_path, relative_path)
+        return (assets.font("assets/fonts/PixelOperator8.ttf", 20),
+                assets.font("assets/fonts/PixelOperator8.ttf", 36),
+                assets.font("assets/fonts/PixelOperator8-Bold.ttf", 48))
+    except:
+        # Fallback to system font if custom font fails to load
+        return (pygame.font.SysFont(None, 20),
+                pygame.font.SysFont(None, 36),
+                pygame.font.SysFont(None, 48))
 
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
+def set_fonts(fonts):
+    global FONT_SMALL, FONT_MEDIUM, FONT_LARGE
+    FONT_SMALL, FONT_MEDIUM, FONT_LARGE = fonts
 
-# Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 400
-GROUND_HEIGHT = 50
-GRAVITY = 1
-JUMP_FORCE = 15
-GAME_SPEED = 5
-BOOST_SPEED = 10  # Speed when boost is active
-ROTATION_SPEED = 10  # Degrees per frame for rotation animation
-TRIANGLE_WIDTH = 150  # 300% of original 50
-PLATFORM_WIDTH = 240  # 300% of original 80
-PLATFORM_HEIGHT = 120  # 300% of original 40
-OBSTACLE_MIN_HEIGHT = 50  # Base height before scaling
-OBSTACLE_MAX_HEIGHT = 100  # Base height before scaling
-OBSTACLE_FREQUENCY = 1500  # milliseconds
-BOOST_FREQUENCY = 5000  # milliseconds
+THEME_MUSIC = "assets/audio/them-song.mp3"
 
-# Audio settings - direct values to avoid any issues
-MUSIC_NORMAL_VOLUME = 1.0  # 100% volume during active gameplay
-MUSIC_IDLE_VOLUME = 0.3    # 30% volume during idle state
-MUSIC_MENU_VOLUME = 0.3    # 10% volume for menu/game over states
+PLAYER_IMAGE_SIZE = (PLAYER_SIZE, PLAYER_SIZE)
 
-try:
-    FONT_SMALL = pygame.font.Font(resource_path("assets/fonts/PixelOperator8.ttf"), 20)
-    FONT_MEDIUM = pygame.font.Font(resource_path("assets/fonts/PixelOperator8.ttf"), 36)
-    FONT_LARGE = pygame.font.Font(resource_path("assets/fonts/PixelOperator8-Bold.ttf"), 48)
-except:
-    # Fallback to system font if custom font fails to load
-    FONT_SMALL = pygame.font.SysFont(None, 20)
-    FONT_MEDIUM = pygame.font.SysFont(None, 36)
-    FONT_LARGE = pygame.font.SysFont(None, 48)
+# Game-over leaderboard rows, between the restart message and the ground
+LEADERBOARD_SHOWN = 3
+LEADERBOARD_NAME_CHARS = 12
+LEADERBOARD_LINE_HEIGHT = 24
 
+def load_player_image(image_path):
+    # Loaded, scaled and converted once per character by the asset manager
+    return assets.image(image_path, PLAYER_IMAGE_SIZE)
 
-# Obstacle types
-OBSTACLE_TRIANGLE = 0
-OBSTACLE_PLATFORM = 1
+def make_coin_image():
+    # Create a gold coin directly instead of using sprite sheet
+    image = pygame.Surface((COIN_SIZE, COIN_SIZE), pygame.SRCALPHA)
+    pygame.draw.circle(image, NEON_ORANGE, (30, 30), 25)
+    pygame.draw.circle(image, (255, 215, 0), (30, 30), 22)  # Gold color
 
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BLUE = (0, 0, 255)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-GRAY = (100, 100, 100)
+    # Draw "x2" text on the coin
+    text = text_cache.render(FONT_SMALL, "x2", WHITE)
+    text_rect = text.get_rect(center=(30, 30))
+    image.blit(text, text_rect)
+    return image
 
-# Neon Colors
-NEON_PINK = (255, 20, 147)
-NEON_GREEN = (57, 255, 20)
-NEON_BLUE = (0, 191, 255)
-NEON_PURPLE = (138, 43, 226)
-NEON_ORANGE = (255, 153, 0)
-NEON_BACKGROUND = (10, 10, 40)
+def make_background():
+    # Static background and ground, drawn once and blitted back each frame
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(NEON_BACKGROUND)
+    # Draw ground
+    pygame.draw.rect(background, NEON_BLUE, (0, SCREEN_HEIGHT - GROUND_HEIGHT, SCREEN_WIDTH, GROUND_HEIGHT))
+    # Add ground glow effect
+    pygame.draw.line(background, NEON_GREEN, (0, SCREEN_HEIGHT - GROUND_HEIGHT), 
+                     (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT), 3)
+    return background
 
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Cloud Dash")
-clock = pygame.time.Clock()
+# The draw_* helpers return the screen area they touched so the dirty
+# rectangle renderer knows what to present and erase next frame
 
-class Player:
-    def __init__(self, image_path):
-        self.original_image = pygame.image.load(resource_path(image_path))
-        self.original_image = pygame.transform.scale(self.original_image, (40, 40))
-        self.image = self.original_image
-        self.rect = self.image.get_rect()
-        self.rect.x = 100
-        self.rect.y = SCREEN_HEIGHT - GROUND_HEIGHT - self.rect.height
-        self.velocity_y = 0
-        self.is_jumping = False
-        self.jump_count = 0
-        self.rotation = 0
-        self.target_rotation = 0  # Target rotation for smooth animation
-        self.boost_active = False
-        self.boost_time = 0
-        self.shield_active = False  # Shield protection from boost
-        self.score_multiplier = 1  # Default score multiplier
-    
-    def jump(self):
-        if not self.is_jumping or self.jump_count < 2:  # Allow double jump
-            self.velocity_y = -JUMP_FORCE
-            self.is_jumping = True
-            self.jump_count += 1
-            # Always rotate clockwise by adding 90 to target_rotation
-            self.target_rotation = (self.target_rotation - 90) % 360
-            # Convert to negative value for clockwise rotation in pygame
-            if self.target_rotation > 0:
-                self.target_rotation -= 360
-    
-    def update(self):
-        # Apply gravity
-        self.velocity_y += GRAVITY
-        self.rect.y += self.velocity_y
+def draw_player(surface, player, frames, alpha=1.0, effects=True):
+    # Interpolate between the last two simulation ticks
+    centerx = player.rect.centerx
+    centery = round(lerp(player.prev_y, player.rect.y, alpha)) + player.rect.height // 2
+    rotation = lerp_angle(player.prev_rotation, player.rotation, alpha)
+    
+    # Look up the pre-rotated image and its offset from the player's center
+    rotated_image, (offset_x, offset_y) = frames.get(rotation)
+    
+    image_pos = (centerx + offset_x, centery + offset_y)
+    rect = rotated_image.get_rect(topleft=image_pos)
+    
+    # Draw shield effect if active (filled circle with transparency)
+    if player.shield_active and effects:
+        rect.union_ip(surface.blit(sprite_cache.shield(), (centerx - SHIELD_RADIUS, centery - SHIELD_RADIUS)))
         
-        # Smooth rotation animation - always rotate clockwise
-        if self.rotation != self.target_rotation:
-            # Always rotate clockwise (decrease rotation value)
-            self.rotation -= ROTATION_SPEED
-            
-            # Fix rotation if we passed the target
-            if self.rotation <= self.target_rotation:
-                self.rotation = self.target_rotation
+    # Draw boost effect if active (glow without border)
+    if player.boost_active and effects:
+        rect.union_ip(surface.blit(sprite_cache.boost_glow(), (centerx - BOOST_GLOW_RADIUS, centery - BOOST_GLOW_RADIUS)))
         
-        # Check if player is on the ground
-        if self.rect.y >= SCREEN_HEIGHT - GROUND_HEIGHT - self.rect.height:
-            self.rect.y = SCREEN_HEIGHT - GROUND_HEIGHT - self.rect.height
-            self.velocity_y = 0
-            self.is_jumping = False
-            self.jump_count = 0
-            
-        # Handle boost
-        if self.boost_active:
-            if pygame.time.get_ticks() - self.boost_time > 3000:  # 3 seconds boost
-                self.boost_active = False
-                self.shield_active = False
-                self.score_multiplier = 1  # Reset score multiplier when boost ends
-                
-    def activate_boost(self):
-        self.boost_active = True
-        self.shield_active = True  # Activate shield with boost
-        self.boost_time = pygame.time.get_ticks()
-        self.score_multiplier = 2  # Double score when boost is active
+    surface.blit(rotated_image, image_pos)
+    return rect
 
-    def draw(self, surface):
-        # Rotate the image
-        rotated_image = pygame.transform.rotate(self.original_image, self.rotation)
-        # Get the rect of the rotated image and set its center to the player's center
-        rotated_rect = rotated_image.get_rect(center=self.rect.center)
-        
-        # Draw shield effect if active (filled circle with transparency)
-        if self.shield_active:
-            shield_surface = pygame.Surface((50, 50), pygame.SRCALPHA)
-            pygame.draw.circle(shield_surface, (0, 100, 255, 100), (25, 25), 25)
-            surface.blit(shield_surface, (self.rect.centerx - 25, self.rect.centery - 25))
-            
-        # Draw boost effect if active (glow without border)
-        if self.boost_active:
-            boost_surface = pygame.Surface((60, 60), pygame.SRCALPHA)
-            pygame.draw.circle(boost_surface, (57, 255, 20, 80), (30, 30), 30)
-            surface.blit(boost_surface, (self.rect.centerx - 30, self.rect.centery - 30))
-            
-        surface.blit(rotated_image, rotated_rect)
+def draw_obstacle(surface, obstacle, alpha=1.0, glow=True):
+    # Glow, fill and outline come pre-rendered from the sprite cache
+    x = round(lerp(obstacle.prev_x, obstacle.rect.x, alpha))
+    if not glow:
+        return surface.blit(sprite_cache.obstacle(obstacle, 0), (x, obstacle.rect.y))
+    return surface.blit(sprite_cache.obstacle(obstacle), (x - OBSTACLE_GLOW, obstacle.rect.y - OBSTACLE_GLOW))
 
-class Obstacle:
-    def __init__(self, x):
-        # Randomly choose obstacle type
-        self.type = random.choice([OBSTACLE_TRIANGLE, OBSTACLE_PLATFORM])
+def draw_boost_item(surface, boost, image, alpha=1.0, glow=True):
+    if not boost.collected:
+        x = round(lerp(boost.prev_x, boost.rect.x, alpha))
+        # Draw the coin with a slight bounce effect
+        bounce_offset = COIN_BOUNCE_OFFSETS[boost.animation_angle // COIN_ANIMATION_STEP]
+        if not glow:
+            return surface.blit(image, (x, boost.rect.y + bounce_offset))
         
-        if self.type == OBSTACLE_TRIANGLE:
-            # Triangle dimensions
-            self.width = 40
-            self.height = 40
-            self.rect = pygame.Rect(x, SCREEN_HEIGHT - GROUND_HEIGHT - self.height, self.width, self.height)
-            # Define triangle points for collision and drawing
-            self.points = [
-                (self.rect.x, self.rect.bottom),
-                (self.rect.x + self.width, self.rect.bottom),
-                (self.rect.x + self.width // 2, self.rect.top)
-            ]
-        else:
-            # Rectangle dimensions
-            self.width = 80
-            self.height = 30
-            self.rect = pygame.Rect(x, SCREEN_HEIGHT - GROUND_HEIGHT - self.height, self.width, self.height)
-            
-        self.passed = False
-        self.landed_on = False  # Track if player has landed on this platform
-        self.color = random.choice([NEON_PINK, NEON_GREEN, NEON_BLUE, NEON_PURPLE, NEON_ORANGE])
-    
-    def update(self, speed=GAME_SPEED):
-        self.rect.x -= speed
-        # Update triangle points if it's a triangle
-        if self.type == OBSTACLE_TRIANGLE:
-            self.points = [
-                (self.rect.x, self.rect.bottom),
-                (self.rect.x + self.width, self.rect.bottom),
-                (self.rect.x + self.width // 2, self.rect.top)
-            ]
-    
-    def draw(self, surface):
-        # Draw with neon style (glow effect)
-        if self.type == OBSTACLE_TRIANGLE:
-            # Draw triangle with glow effect
-            glow_surface = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
-            pygame.draw.polygon(glow_surface, (*self.color[:3], 100), [
-                (5, self.height + 5),
-                (self.width + 5, self.height + 5),
-                (self.width // 2 + 5, 5)
-            ])
-            surface.blit(glow_surface, (self.rect.x - 5, self.rect.y - 5))
-            
-            # Draw main triangle
-            pygame.draw.polygon(surface, self.color, self.points)
-            # Draw outline
-            pygame.draw.polygon(surface, WHITE, self.points, 2)
+        # Add pulsing glow effect from the precomputed frames
+        rect = surface.blit(sprite_cache.coin_glow(boost.animation_angle), (x - 10, boost.rect.y - 10))
+        return rect.union(surface.blit(image, (x, boost.rect.y + bounce_offset)))
+    return None
+
+class Renderer:
+    # Draws a Simulation onto any surface; shared by the game window and
+    # headless consumers such as the environment's pixel observations
+    def __init__(self, dirty_rects=False, lazy=False):
+        # Dirty rectangle mode only restores the areas drawn last frame
+        self.dirty_rects = dirty_rects
+        self.full_redraw = True
+        self.drawn_rects = []
+        self.previous_rects = []
+        self.background = make_background()
+        # Lazy renderers draw what is ready and leave the rest to the
+        # background loader (see Game); others load everything up front
+        self.lazy = lazy
+        if not lazy:
+            if FONT_MEDIUM is None:
+                set_fonts(load_fonts())
+            sprite_cache.preload()
+        self.coin_image = None
+        if FONT_SMALL is not None:
+            self.fonts_loaded()
+        self.player_image_path = None
+        self.player_frames = None
+        # Optional GhostRace drawn behind the player, with its own frames
+        self.ghosts = None
+        self.ghost_frames = None
+        # Optional Leaderboard whose cached top scores follow "Game Over!"
+        self.leaderboard = None
+        # Half-resolution target, kept with its scaled sprites once made
+        self.scaled_target = None
+        self.set_quality(QUALITY_FULL)
+    
+    def set_quality(self, level):
+        # See quality.py for what each level leaves out
+        self.quality = level
+        self.glows = level < QUALITY_NO_GLOWS
+        self.effects = level < QUALITY_NO_EFFECTS
+        self.target = None
+        if level >= QUALITY_HALF_RES:
+            if self.scaled_target is None:
+                self.scaled_target = ScaledTarget((round(SCREEN_WIDTH * QUALITY_RENDER_SCALE),
+                                                   round(SCREEN_HEIGHT * QUALITY_RENDER_SCALE)))
+            self.target = self.scaled_target
+        # The screen still holds the previous level's picture
+        self.full_redraw = True
+    
+    def fonts_loaded(self):
+        # The coin has its "x2" label baked in
+        self.coin_image = make_coin_image().convert_alpha()
+    
+    def load_player_frames(self, sim):
+        # The simulation picks the character; its rotation frames are built
+        # once per image and shared by every later reset
+        path = sim.player.image_path
+        if path != self.player_image_path:
+            if self.lazy and not assets.has_image(path, PLAYER_IMAGE_SIZE):
+                # Still loading; the player appears once the image arrives
+                self.player_frames = None
+                return
+            self.player_image_path = path
+            self.player_frames = sprite_cache.rotation_frames(path, lambda: load_player_image(path))
+    
+    def draw(self, surface, sim, alpha=1.0, hud=True):
+        # Each group is a separate method so the profiler can time it.
+        # surface may be a ScaledTarget when hud is off
+        self.load_player_frames(sim)
+        world = surface
+        if self.target is not None:
+            # The world goes to the smaller target and is scaled up over the
+            # whole screen, so every scaled frame is a full redraw
+            world = self.target
+            self.full_redraw = True
+        self.draw_background(world)
+        self.drawn_rects = []
+        self.draw_boost_items(world, sim, alpha)
+        self.draw_ghosts(world, sim, alpha)
+        self.draw_actors(world, sim, alpha)
+        if world is not surface:
+            world.present(surface)
+        if hud:
+            self.draw_hud(surface, sim)
+    
+    def draw_background(self, surface):
+        # Restore the cached background: everywhere, or only where the
+        # previous frame drew in dirty rectangle mode
+        if self.dirty_rects and not self.full_redraw:
+            for rect in self.previous_rects:
+                surface.blit(self.background, rect, rect)
         else:
-            # Draw rectangle with glow effect
-            glow_surface = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surface, (*self.color[:3], 100), (5, 5, self.width, self.height))
-            surface.blit(glow_surface, (self.rect.x - 5, self.rect.y - 5))
-            
-            # Draw main rectangle
-            pygame.draw.rect(surface, self.color, self.rect)
-            # Draw outline
-            pygame.draw.rect(surface, WHITE, self.rect, 2)
-            
-    def check_collision(self, player_rect):
-        # For rectangle, use standard rect collision
-        if self.type == OBSTACLE_PLATFORM:
-            return player_rect.colliderect(self.rect)
-        
-        # For triangle, check if player is inside the triangle
-        # First check if player rect overlaps with triangle rect (optimization)
-        if not player_rect.colliderect(self.rect):
-            return False
-            
-        # Check if player's bottom points are inside the triangle
-        bottom_left = (player_rect.left + 5, player_rect.bottom - 5)
-        bottom_right = (player_rect.right - 5, player_rect.bottom - 5)
-        
-        # Simple point in triangle check for bottom corners
-        return self.point_in_triangle(bottom_left) or self.point_in_triangle(bottom_right)
-    
-    def point_in_triangle(self, point):
-        # Check if a point is inside the triangle using barycentric coordinates
-        x, y = point
-        x1, y1 = self.points[0]
-        x2, y2 = self.points[1]
-        x3, y3 = self.points[2]
-        
-        def area(x1, y1, x2, y2, x3, y3):
-            return abs((x1*(y2-y3) + x2*(y3-y1) + x3*(y1-y2))/2.0)
-        
-        # Calculate area of triangle
-        A = area(x1, y1, x2, y2, x3, y3)
+            surface.blit(self.background, (0, 0))
+    
+    def draw_boost_items(self, surface, sim, alpha):
+        if self.coin_image is None:
+            return
+        drawn = self.drawn_rects
+        glow = self.glows
+        for boost in sim.boost_items:
+            rect = draw_boost_item(surface, boost, self.coin_image, alpha, glow)
+            if rect:
+                drawn.append(rect)
+    
+    def draw_ghosts(self, surface, sim, alpha):
+        if self.ghosts is None:
+            return
+        if self.ghost_frames is None:
+            # Every ghost shares translucent frames of the first character
+            path = PLAYER_IMAGES[0]
+            if self.lazy and not assets.has_image(path, PLAYER_IMAGE_SIZE):
+                return
+            self.ghost_frames = sprite_cache.rotation_frames(
+                ("ghost", path), lambda: make_ghost_image(load_player_image(path)))
+        rect = self.ghosts.draw(surface, sim, self.ghost_frames, alpha, self.dirty_rects)
+        if rect:
+            self.drawn_rects.append(rect)
+    
+    def draw_actors(self, surface, sim, alpha):
+        # Draw player and obstacles
+        drawn = self.drawn_rects
+        if self.player_frames is not None:
+            drawn.append(draw_player(surface, sim.player, self.player_frames, alpha, self.effects))
+        glow = self.glows
+        for obstacle in sim.obstacles:
+            drawn.append(draw_obstacle(surface, obstacle, alpha, glow))
+    
+    def draw_hud(self, surface, sim):
+        if FONT_MEDIUM is None:
+            # Fonts are still loading
+            return
+        drawn = self.drawn_rects
         
-        # Calculate areas of 3 triangles formed by point and each side
-        A1 = area(x, y, x2, y2, x3, y3)
-        A2 = area(x1, y1, x, y, x3, y3)
-        A3 = area(x1, y1, x2, y2, x, y)
+        # Draw "Press SPACE to start" message if game is not active and not game over
+        if not sim.game_active and not sim.game_over:
+            drawn.append(text_cache.draw(surface, FONT_MEDIUM, "Press SPACE to start", NEON_GREEN,
+                                         center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
         
-        # Check if sum of 3 areas equals the original triangle area
-        return abs(A - (A1 + A2 + A3)) < 0.1
-
-class BoostItem:
-    def __init__(self, x, y=None):
-        # Create a gold coin directly instead of using sprite sheet
-        self.image = pygame.Surface((60, 60), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, NEON_ORANGE, (30, 30), 25)
-        pygame.draw.circle(self.image, (255, 215, 0), (30, 30), 22)  # Gold color
+        # Draw score with custom font, digits come from the glyph atlas
+        drawn.append(text_cache.draw_number(surface, FONT_MEDIUM, NEON_GREEN, "Score: ", sim.score, topleft=(10, 10)))
         
-        # Draw "x2" text on the coin
-        text = FONT_SMALL.render("x2", True, WHITE)
-        text_rect = text.get_rect(center=(30, 30))
-        self.image.blit(text, text_rect)
+        # Draw status indicators at top right
+        status_x = SCREEN_WIDTH - 10
+        status_y = 10
         
-        # Allow custom y position or use default
-        if y is None:
-            y = SCREEN_HEIGHT - GROUND_HEIGHT - 70
+        # Draw shield status if active
+        if sim.player.shield_active:
+            shield_text = text_cache.render(FONT_SMALL, "Protected", NEON_BLUE)
+            shield_rect = shield_text.get_rect(topright=(status_x, status_y))
+            
+            # Draw background for better visibility
+            bg_rect = shield_rect.copy()
+            bg_rect.inflate_ip(10, 6)
+            drawn.append(pygame.draw.rect(surface, (0, 0, 0, 128), bg_rect, border_radius=5))
             
-        self.rect = pygame.Rect(x, y, 60, 60)
-        self.collected = False
-        self.animation_angle = 0
-        self.animation_speed = 5  # Degrees per frame
+            surface.blit(shield_text, shield_rect)
+            status_y += 25
         
-    def update(self, speed=GAME_SPEED):
-        self.rect.x -= speed
+        # Draw boost countdown if active
+        if sim.player.boost_active:
+            elapsed_ms = (sim.tick - sim.player.boost_tick) * 1000 // TICK_RATE
+            remaining = BOOST_DURATION // 1000 - elapsed_ms // 1000
+            if remaining < 0:
+                remaining = 0
+            boost_rect = text_cache.number_rect(FONT_SMALL, NEON_ORANGE, "x2 Score: ", remaining, "s",
+                                                topright=(status_x, status_y))
+            
+            # Draw background for better visibility
+            bg_rect = boost_rect.copy()
+            bg_rect.inflate_ip(10, 6)
+            drawn.append(pygame.draw.rect(surface, (0, 0, 0, 128), bg_rect, border_radius=5))
+            
+            text_cache.draw_number(surface, FONT_SMALL, NEON_ORANGE, "x2 Score: ", remaining, "s",
+                                   topleft=boost_rect.topleft)
         
-        # Update animation angle for spinning effect
-        self.animation_angle = (self.animation_angle + self.animation_speed) % 360
-    
-    def draw(self, surface):
-        if not self.collected:
-            # Add pulsing glow effect
-            glow_size = 36 + int(math.sin(math.radians(self.animation_angle)) * 4)
-            glow_surface = pygame.Surface((80, 80), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (NEON_ORANGE[0], NEON_ORANGE[1], NEON_ORANGE[2], 100), (40, 40), glow_size)
-            surface.blit(glow_surface, (self.rect.x - 10, self.rect.y - 10))
+        # Draw game over message with custom font
+        if sim.game_over:
+            # Shadow effect for game over text
+            drawn.append(text_cache.draw(surface, FONT_LARGE, "Game Over!", (20, 20, 20),
+                                         center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 28)))
+            
+            # Main game over text
+            drawn.append(text_cache.draw(surface, FONT_LARGE, "Game Over!", NEON_PINK,
+                                         center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30)))
+            
+            # Restart instruction
+            drawn.append(text_cache.draw(surface, FONT_MEDIUM, "Press R to restart", NEON_GREEN,
+                                         center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20)))
             
-            # Draw the coin with a slight bounce effect
-            bounce_offset = int(math.sin(math.radians(self.animation_angle * 2)) * 3)
-            surface.blit(self.image, (self.rect.x, self.rect.y + bounce_offset))
+            if self.leaderboard:
+                self.draw_leaderboard(surface)
+    
+    def draw_leaderboard(self, surface):
+        # Top scores from the board cache; never waits on the network
+        drawn = self.drawn_rects
+        y = SCREEN_HEIGHT // 2 + 55
+        for rank, entry in enumerate(self.leaderboard.top()[:LEADERBOARD_SHOWN], 1):
+            line = f"{rank}. {entry['name'][:LEADERBOARD_NAME_CHARS]}  {entry['score']}"
+            drawn.append(text_cache.draw(surface, FONT_SMALL, line, NEON_ORANGE,
+                                         center=(SCREEN_WIDTH // 2, y)))
+            y += LEADERBOARD_LINE_HEIGHT
+    
+    def present_offscreen(self):
+        # Bookkeeping of present() for surfaces that are never shown, so
+        # the next dirty-rectangle draw knows what to erase
+        self.full_redraw = False
+        self.previous_rects = self.drawn_rects
+    
+    def present(self):
+        if self.dirty_rects and not self.full_redraw:
+            # Push only what was erased or drawn this frame
+            pygame.display.update(self.previous_rects + self.drawn_rects)
+        else:
+            pygame.display.flip()
+            self.full_redraw = False
+        self.previous_rects = self.drawn_rects
+    
 
 class Game:
-    def __init__(self):
-        # Randomly choose between pixel.png and pixel_1.png for player character
-        player_image = random.choice(["assets/images/character/pixel.png", "assets/images/character/pixel_1.png"])
-        self.player = Player(player_image)
-        self.obstacles = []
-        self.boost_items = []
-        self.score = 0
-        self.game_over = False
-        self.last_obstacle_time = pygame.time.get_ticks()
-        self.last_boost_time = pygame.time.get_ticks()
+    def __init__(self, render_fps=RENDER_FPS, max_speed=False, dirty_rects=False,
+                 seed=None, record_path=None, precise_collision=True, profiler=None, profile_path=None,
+                 startup_report_requested=False, telemetry=None, level=None, ghost_logs=None, quality=None,
+                 leaderboard=None):
+        self.sim = Simulation(seed, precise_collision, level)
+        # Gameplay events go out as NDJSON from a background thread, to
+        # stdout unless a telemetry sink is given
+        self.telemetry = telemetry or Telemetry()
+        self.session_start_tick = 0
+        # Every input is recorded; the log is written on exit if requested
+        self.recorder = InputRecorder(self.sim)
+        self.record_path = record_path
+        self.timestep = FixedTimestep()
+        self.render_fps = render_fps
+        # Max speed runs simulation ticks back-to-back and only renders
+        # about once per render interval, for batch runs
+        self.max_speed = max_speed
+        self.renderer = Renderer(dirty_rects, lazy=True)
+        # Optional Leaderboard: finished runs are submitted in the background
+        # and its cached board is shown on the game-over screen
+        self.leaderboard = leaderboard
+        self.renderer.leaderboard = leaderboard
+        # A fixed quality level, or None to let the governor pick one from
+        # frame times (not in max speed mode, where frames are always full)
+        self.governor = None
+        if quality is not None:
+            self.renderer.set_quality(quality)
+        elif not max_speed:
+            self.governor = QualityGovernor(render_fps)
+        # Optional FrameProfiler; its samples are exported on exit if a path is given
+        self.profiler = profiler
+        self.profile_path = profile_path
+        if profiler:
+            self.instrument(profiler)
+        self.jump_requested = False
         self.last_action_time = pygame.time.get_ticks()
         self.idle_state = False
+        self.music_playing = False
+        # Theme decoded once into memory; volume changes are fades
+        self.music = Music(MUSIC_MENU_VOLUME)  # Start at 10% volume
         
-        # Load theme music and play at low volume
-        try:
-            pygame.mixer.music.load("assets/audio/them-song.mp3")
-            pygame.mixer.music.set_volume(MUSIC_MENU_VOLUME)  # Start at 10% volume
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-            self.music_playing = True
-            self.game_active = False  # Track if gameplay has started
-            print("Theme music playing at 10% volume")
-        except Exception as e:
-            print(f"Could not load theme music: {e}")
+        # Fonts, character images and the theme load in the background while
+        # the first frames are already on screen
+        self.startup_report_requested = startup_report_requested
+        self.loading = True
+        self.loader = BackgroundLoader(startup_report, on_error=self.load_failed)
+        self.loader.submit("fonts", load_fonts, self.fonts_ready)
+        for path in PLAYER_IMAGES:
+            self.loader.submit(f"image {path}", lambda path=path: assets.load_image(path, PLAYER_IMAGE_SIZE),
+                               lambda image, path=path: assets.add_image(path, PLAYER_IMAGE_SIZE, image))
+        # Opening the audio device and decoding the theme is the slowest part of startup
+        self.loader.submit("audio", lambda: self.music.load(THEME_MUSIC), self.audio_ready, self.audio_failed)
+        # Ghost runs are re-simulated from their input logs; they join the
+        # race whenever they are ready
+        if ghost_logs:
+            self.loader.submit("ghosts", lambda: load_ghosts(ghost_logs, level), self.ghosts_ready)
+    
+    def fonts_ready(self, fonts):
+        set_fonts(fonts)
+        self.renderer.fonts_loaded()
+    
+    def audio_ready(self, _):
+        # Loop the theme on its own channel at low volume
+        self.music.play()
+        self.music_playing = True
+        self.telemetry.emit("music_playing", volume=self.music.volume)
+    
+    def ghosts_ready(self, ghosts):
+        for path, e in ghosts.skipped:
+            self.telemetry.emit("ghost_skipped", path=path, message=str(e))
+        ghosts.start(self.session_start_tick)
+        self.renderer.ghosts = ghosts
+    
+    def audio_failed(self, e):
+        self.telemetry.emit("music_error", message=str(e))
+    
+    def load_failed(self, name, e):
+        self.telemetry.emit("load_error", name=name, message=str(e))
+    
+    def start_session(self):
+        self.session_start_tick = self.sim.tick
+        if self.renderer.ghosts:
+            self.renderer.ghosts.start(self.sim.tick)
+        self.telemetry.emit("session_start", seed=self.sim.seed, tick=self.sim.tick)
+    
+    def set_volume(self, volume, reason):
+        # Fades to the new volume; remembered until the music is ready
+        self.telemetry.emit("volume", volume=volume, reason=reason)
+        if volume > self.music.target_volume():
+            duration = MUSIC_FADE_IN_MS
+        else:
+            duration = MUSIC_FADE_OUT_MS
+        self.music.fade_to(volume, duration, pygame.time.get_ticks())
+    
+    def poll_loader(self):
+        # Runs ready-callbacks for finished loads on the main thread
+        if self.loading and self.loader.poll():
+            self.loading = False
+            startup_report.milestone("loaded")
+            if self.startup_report_requested:
+                print(startup_report.format())
+    
+    def finish_loading(self):
+        # Block until everything is loaded, for scripted and headless use
+        self.loader.wait()
+        self.poll_loader()
+    
+    def instrument(self, profiler):
+        profiler.instrument(self, {"handle_events": "events", "update": "update", "draw": "draw",
+                                   "present": "present"})
+        profiler.instrument(self.sim, {"update_obstacles": "update.obstacles",
+                                       "check_collision": "update.collisions",
+                                       "spawn_boost_item": "update.coin_placement",
+                                       "update_boost_items": "update.coins"})
+        profiler.instrument(self.renderer, {"draw_background": "draw.background",
+                                            "draw_boost_items": "draw.coins",
+                                            "draw_ghosts": "draw.ghosts", "draw_actors": "draw.actors",
+                                            "draw_hud": "draw.hud"})
+        profiler.instrument(text_cache, {"draw": "draw.text", "draw_number": "draw.text"})
+    
+    def frame_done(self, work_ms):
+        level = self.governor.frame_done(work_ms)
+        if level is not None:
+            self.renderer.set_quality(level)
+            self.telemetry.emit("quality", level=level, name=QUALITY_NAMES[level])
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
             if event.type == pygame.KEYDOWN:
                 # Any key press resets the idle timer
                 self.last_action_time = pygame.time.get_ticks()
                 
                 # Handle idle state volume
-                if self.idle_state and self.game_active:
+                if self.idle_state and self.sim.game_active:
                     self.idle_state = False
-                    pygame.mixer.music.set_volume(MUSIC_NORMAL_VOLUME)  # Force 100% volume
-                    print("Key pressed: setting volume to 100%")
+                    self.set_volume(MUSIC_NORMAL_VOLUME, "key_press")  # Force 100% volume
                 
                 # Space key starts the game or makes the player jump
                 if event.key == pygame.K_SPACE:
-                    if not self.game_active and not self.game_over:
-                        # Start the game
-                        self.game_active = True
-                        pygame.mixer.music.set_volume(MUSIC_NORMAL_VOLUME)  # Full volume
-                        print("Game started - music at 100% volume")
-                    elif self.game_active:
-                        # Jump only if game is active
-                        self.player.jump()
+                    if self.sim.start():
+                        self.recorder.start()
+                        self.start_session()
+                        self.set_volume(MUSIC_NORMAL_VOLUME, "game_start")  # Full volume
+                    elif self.sim.game_active:
+                        # Jump is applied on the next simulation step
+                        self.jump_requested = True
                         
                 # Reset game if game over
-                if event.key == pygame.K_r and self.game_over:
+                if event.key == pygame.K_r and self.sim.game_over:
                     self.reset()
     
     def check_idle_state(self):
         # Separate method to handle idle state and audio volume
         current_time = pygame.time.get_ticks()
+        player = self.sim.player
 
         # Check for idle state (5 seconds of inactivity)
         if current_time - self.last_action_time > 5000 and not self.idle_state:
             self.idle_state = True
             # Set volume to 30% when in idle state
-            pygame.mixer.music.set_volume(MUSIC_IDLE_VOLUME)
-            print("Setting idle volume: 30%")  # Debug message
+            self.set_volume(MUSIC_IDLE_VOLUME, "idle")
         
         # Check if player is active
-        elif (self.player.velocity_y != 0 or self.player.boost_active) and self.idle_state:
+        elif (player.velocity_y != 0 or player.boost_active) and self.idle_state:
             self.idle_state = False
             # Set volume to 100% when active
-            pygame.mixer.music.set_volume(MUSIC_NORMAL_VOLUME)
-            print("Setting active volume: 100%")  # Debug message
+            self.set_volume(MUSIC_NORMAL_VOLUME, "active")
             self.last_action_time = current_time
-
-            
-    def update(self):
-        if not self.game_over:
-            self.player.update()
-            
-            # Check and update idle state
-            self.check_idle_state()
-            
-            # Only update game elements if game is active
-            if self.game_active:
-                # Determine current game speed
-                current_speed = BOOST_SPEED if self.player.boost_active else GAME_SPEED
-                
-                # Generate obstacles
-                current_time = pygame.time.get_ticks()
-                if current_time - self.last_obstacle_time > OBSTACLE_FREQUENCY:
-                    self.obstacles.append(Obstacle(SCREEN_WIDTH))
-                    self.last_obstacle_time = current_time
-            
-            # Generate boost items (only if game is active)
-            if self.game_active and current_time - self.last_boost_time > BOOST_FREQUENCY:
-                # Check if there's enough space for the coin (no obstacles nearby)
-                can_place_coin = True
-                coin_x = SCREEN_WIDTH
-                min_distance = 200  # Minimum distance between coin and obstacles
-                
-                # Alternate between high and low positions for coins
-                coin_positions = [
-                    SCREEN_HEIGHT - GROUND_HEIGHT - 70,  # Low position
-                    SCREEN_HEIGHT - GROUND_HEIGHT - 150  # High position
-                ]
-                coin_y = random.choice(coin_positions)
-                
-                # Create a temporary rect to check for collisions
-                temp_coin_rect = pygame.Rect(coin_x, coin_y, 60, 60)
-                
-                for obstacle in self.obstacles:
-                    # Check if any obstacle is too close to the coin position
-                    if abs(obstacle.rect.x - coin_x) < min_distance:
-                        can_place_coin = False
-                        break
-                    
-                    # Also check if the obstacle rect would overlap with coin rect
-                    obstacle_future_rect = pygame.Rect(
-                        obstacle.rect.x, obstacle.rect.y, 
-                        obstacle.rect.width, obstacle.rect.height
-                    )
-                    # Project obstacle position to where it would be when coin arrives
-                    obstacle_future_rect.x += min_distance
-                    
-                    if obstacle_future_rect.colliderect(temp_coin_rect):
-                        can_place_coin = False
-                        break
-                
-                if can_place_coin:
-                    self.boost_items.append(BoostItem(SCREEN_WIDTH, coin_y))
-                    self.last_boost_time = current_time
-                else:
-                    # Delay coin generation by a bit to avoid obstacle
-                    self.last_boost_time = current_time - 3000
-            
-            # Update obstacles (only if game is active)
-            if self.game_active:
-                for obstacle in self.obstacles[:]:
-                    obstacle.update(current_speed)
-                    
-                    # Check if player passed the obstacle
-                    if not obstacle.passed and obstacle.rect.right < self.player.rect.left:
-                        obstacle.passed = True
-                        # Apply score multiplier when player has boost active
-                        self.score += (1 * self.player.score_multiplier)
-                
-                    # Remove obstacles that are off-screen
-                    if obstacle.rect.right < 0:
-                        self.obstacles.remove(obstacle)
-                        continue
-                    
-                    # Check for collisions
-                    if obstacle.check_collision(self.player.rect):
-                        # For platforms, check if player is landing on top
-                        if obstacle.type == OBSTACLE_PLATFORM:
-                            # Check if player's bottom is near the platform's top and falling
-                            platform_top = obstacle.rect.top
-                            player_bottom = self.player.rect.bottom
-                            
-                            # If player is landing on top of platform (with small margin)
-                            if player_bottom <= platform_top + 10 and self.player.velocity_y > 0:
-                                # Land on platform
-                                self.player.rect.bottom = platform_top
-                                self.player.velocity_y = 0
-                                self.player.is_jumping = False
-                                self.player.jump_count = 0
-                                obstacle.landed_on = True
-                                continue
-                    
-                        # For triangles or side collisions with platforms, it's game over or shield loss
-                        if self.player.shield_active:
-                            # Remove shield protection instead of game over
-                            self.player.shield_active = False
-                            self.obstacles.remove(obstacle)
-                        else:
-                            self.game_over = True
-                            self.game_active = False
-                            # Reduce music volume when character dies
-                            if self.music_playing:
-                                pygame.mixer.music.set_volume(MUSIC_MENU_VOLUME)  # 10% volume
-                                print("Character died - music at 10% volume")
-            
-            # Update boost items (only if game is active)
-            if self.game_active:
-                for boost in self.boost_items[:]:
-                    boost.update(current_speed)
-                    
-                    # Check if player collected the boost
-                    if not boost.collected and self.player.rect.colliderect(boost.rect):
-                        boost.collected = True
-                        self.player.activate_boost()
-                    
-                    # Remove boost items that are off-screen or collected
-                    if boost.rect.right < 0 or boost.collected:
-                        self.boost_items.remove(boost)
-            
-            # We've already handled collisions in the obstacle update loop above
-            # This duplicate collision check is removed to fix the SyntaxError
     
-    def draw(self):
-        screen.fill(NEON_BACKGROUND)
+    def update(self, elapsed_ms=TICK_MS):
+        self.music.update(pygame.time.get_ticks())
         
-        # Draw "Press SPACE to start" message if game is not active and not game over
-        if not self.game_active and not self.game_over:
-            start_text = FONT_MEDIUM.render("Press SPACE to start", True, NEON_GREEN)
-            text_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            screen.blit(start_text, text_rect)
-        
-        # Draw ground
-        pygame.draw.rect(screen, NEON_BLUE, (0, SCREEN_HEIGHT - GROUND_HEIGHT, SCREEN_WIDTH, GROUND_HEIGHT))
-        # Add ground glow effect
-        pygame.draw.line(screen, NEON_GREEN, (0, SCREEN_HEIGHT - GROUND_HEIGHT), 
-                         (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT), 3)
-        
-        # Draw boost items
-        for boost in self.boost_items:
-            boost.draw(screen)
-            
-        # Draw player and obstacles
-        self.player.draw(screen)
-        for obstacle in self.obstacles:
-            obstacle.draw(screen)
+        if self.max_speed:
+            # Keep ticking until a render interval of real time has passed
+            deadline = time.perf_counter() + 1.0 / (self.render_fps or RENDER_FPS)
+            while not self.sim.game_over and time.perf_counter() < deadline:
+                self.step()
+            return
         
-        # Draw score with custom font
-        score_text = FONT_MEDIUM.render(f"Score: {self.score}", True, NEON_GREEN)
-        screen.blit(score_text, (10, 10))
+        for _ in range(self.timestep.advance(elapsed_ms)):
+            self.step()
+    
+    def step(self):
+        if self.sim.game_over:
+            return
         
-        # Draw status indicators at top right
-        status_x = SCREEN_WIDTH - 10
-        status_y = 10
+        if self.jump_requested:
+            self.recorder.jump()
+        self.sim.step(self.jump_requested)
+        self.jump_requested = False
         
-        # Draw shield status if active
-        if self.player.shield_active:
-            shield_text = FONT_SMALL.render("Protected", True, NEON_BLUE)
-            shield_rect = shield_text.get_rect(topright=(status_x, status_y))
-            
-            # Draw background for better visibility
-            bg_rect = shield_rect.copy()
-            bg_rect.inflate_ip(10, 6)
-            pygame.draw.rect(screen, (0, 0, 0, 128), bg_rect, border_radius=5)
-            
-            screen.blit(shield_text, shield_rect)
-            status_y += 25
+        # Jumps, spawns, pickups, shield breaks and deaths
+        for event in self.sim.events:
+            self.telemetry.emit(event, tick=self.sim.tick)
         
-        # Draw boost countdown if active
-        if self.player.boost_active:
-            remaining = 3 - (pygame.time.get_ticks() - self.player.boost_time) // 1000
-            if remaining < 0:
-                remaining = 0
-            boost_text = FONT_SMALL.render(f"x2 Score: {remaining}s", True, NEON_ORANGE)
-            boost_rect = boost_text.get_rect(topright=(status_x, status_y))
-            
-            # Draw background for better visibility
-            bg_rect = boost_rect.copy()
-            bg_rect.inflate_ip(10, 6)
-            pygame.draw.rect(screen, (0, 0, 0, 128), bg_rect, border_radius=5)
-            
-            screen.blit(boost_text, boost_rect)
+        # Check and update idle state
+        self.check_idle_state()
         
-        # Draw game over message with custom font
-        if self.game_over:
-            # Shadow effect for game over text
-            game_over_shadow = FONT_LARGE.render("Game Over!", True, (20, 20, 20))
-            shadow_rect = game_over_shadow.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 28))
-            screen.blit(game_over_shadow, shadow_rect)
-            
-            # Main game over text
-            game_over_text = FONT_LARGE.render("Game Over!", True, NEON_PINK)
-            text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30))
-            screen.blit(game_over_text, text_rect)
-            
-            # Restart instruction
-            restart_text = FONT_MEDIUM.render("Press R to restart", True, NEON_GREEN)
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
-            screen.blit(restart_text, restart_rect)
+        # Death, or the end of a level
+        if self.sim.game_over:
+            ticks = self.sim.tick - self.session_start_tick
+            self.telemetry.emit("session_end", seed=self.sim.seed, score=self.sim.score, ticks=ticks)
+            if self.leaderboard:
+                self.leaderboard.record(self.sim.score, self.sim.seed, ticks / TICK_RATE)
+            # Reduce music volume when character dies
+            if self.music_playing:
+                self.set_volume(MUSIC_MENU_VOLUME, "death")  # 10% volume
     
     def reset(self):
-        # Randomly choose between pixel.png and pixel_1.png for player character on reset
-        player_image = random.choice(["assets/images/character/pixel.png", "assets/images/character/pixel_1.png"])
-        self.player = Player(player_image)
-        self.obstacles = []
-        self.boost_items = []
-        self.score = 0
-        self.game_over = False
-        self.last_obstacle_time = pygame.time.get_ticks()
-        self.last_boost_time = pygame.time.get_ticks()
+        # The simulation picks a new random character on reset
+        self.recorder.restart()
+        self.sim.reset()
+        self.jump_requested = False
+        self.timestep.reset()
         self.last_action_time = pygame.time.get_ticks()
         self.idle_state = False
-        self.game_active = True
+        self.start_session()
         
         # Reset music to normal volume when game restarts
         if self.music_playing:
-            pygame.mixer.music.set_volume(MUSIC_NORMAL_VOLUME)
-            print("Game reset - music at 100% volume")
+            self.set_volume(MUSIC_NORMAL_VOLUME, "reset")
+    
+    def draw(self):
+        # How far between the last two ticks this frame falls
+        alpha = 1.0 if self.max_speed or self.sim.game_over else self.timestep.alpha
+        self.renderer.draw(screen, self.sim, alpha)
+        if self.profiler and FONT_SMALL is not None:
+            self.renderer.drawn_rects.append(self.profiler.draw_overlay(screen, FONT_SMALL))
+    
+    def present(self):
+        self.renderer.present()
+    
+    def quit(self):
+        if self.record_path:
+            self.recorder.finish().save(self.record_path)
+            print(f"Input log written to {self.record_path} (seed {self.sim.seed})")
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
+            print(f"Profile written to {self.profile_path}")
+        self.loader.shutdown()
+        if self.leaderboard:
+            self.leaderboard.close()
+        self.telemetry.close()
+        pygame.quit()
+        sys.exit()
     
     def run(self):
-        # Music will start only when user interacts with the game
+        # The first frame goes up straight away, with whatever has loaded
+        self.draw()
+        self.present()
+        startup_report.milestone("first frame")
+        with startup_report.stage("sprites"):
+            sprite_cache.preload()
+        
+        clock.tick()
         while True:
+            # Real time since the last frame feeds the fixed-timestep clock
+            elapsed_ms = clock.tick(0 if self.max_speed else self.render_fps)
+            if self.profiler:
+                self.profiler.begin_frame()
+            frame_start = time.perf_counter()
+            self.poll_loader()
             self.handle_events()
-            self.update()
+            self.update(elapsed_ms)
             self.draw()
-            pygame.display.flip()
-            clock.tick(60)
+            self.present()
+            if self.governor and not self.loading:
+                # Only the frame's own work counts, not the wait for the next one
+                self.frame_done((time.perf_counter() - frame_start) * 1000)
 
 # Start the game
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    # --fps N renders at N Hz (simulation stays at TICK_RATE); --max-speed
+    # runs the simulation as fast as possible; --dirty-rects presents only
+    # the regions that changed; --seed N fixes the run; --record PATH writes
+    # an input log for replay.py on exit; --classic-collision uses the old
+    # rect / corner-point collision instead of pixel-perfect masks;
+    # --profile shows a frame-time overlay and --profile-out PATH also writes
+    # the timings on exit as Chrome trace JSON (.json) or CSV;
+    # --startup-report prints how long each startup stage took;
+    # --telemetry PATH appends gameplay events as NDJSON to PATH instead of stdout;
+    # --level PATH plays a level file built with level.py instead of random spawns;
+    # --ghosts DIR races against up to 100 ghosts replaying the input logs in DIR;
+    # --quality N pins the render quality level (0 full to 3 lowest, see
+    # quality.py) instead of adapting it to frame times; --leaderboard URL
+    # submits finished runs to a leaderboard service and shows its top scores
+    # on the game-over screen (--leaderboard-name NAME, default the host name)
+    def option(name, default=None):
+        if name in sys.argv:
+            return sys.argv[sys.argv.index(name) + 1]
+        return default
+    
+    seed = option("--seed")
+    profile_path = option("--profile-out")
+    level_path = option("--level")
+    level = LevelFile(level_path) if level_path else None
+    quality = option("--quality")
+    leaderboard_url = option("--leaderboard")
+    leaderboard = Leaderboard(leaderboard_url, option("--leaderboard-name")) if leaderboard_url else None
+    ghost_dir = option("--ghosts")
+    ghost_logs = None
+    if ghost_dir:
+        ghost_logs = sorted(os.path.join(ghost_dir, name) for name in os.listdir(ghost_dir)
+                            if name.endswith(".cdr"))
+    profiler = FrameProfiler(int(option("--fps", RENDER_FPS))) if profile_path or "--profile" in sys.argv else None
+    game = Game(render_fps=int(option("--fps", RENDER_FPS)), max_speed="--max-speed" in sys.argv,
+                dirty_rects="--dirty-rects" in sys.argv,
+                seed=int(seed) if seed is not None else None, record_path=option("--record"),
+                precise_collision="--classic-collision" not in sys.argv,
+                profiler=profiler, profile_path=profile_path,
+                startup_report_requested="--startup-report" in sys.argv,
+                telemetry=Telemetry(option("--telemetry")),
+                level=level, ghost_logs=ghost_logs, quality=int(quality) if quality is not None else None,
+                leaderboard=leaderboard)
+    game.run()
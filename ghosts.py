@@ -0,0 +1,127 @@
+# Ghost players replaying recorded runs next to the live player.
+#
+# A ghost is a GhostTrack: per-tick distance, y and rotation frame of one
+# recorded run, packed into typed arrays (7 bytes a tick, about 25 KB for a
+# minute). Tracks are rebuilt from input logs by replaying them headlessly.
+#
+# Every ghost shares one set of translucent rotation frames, so drawing them
+# is picking a frame per ghost and handing the whole list to a single
+# Surface.blits() call: no per-ghost rotation, alpha surface or Python-level
+# blit. A ghost is drawn at its distance relative to the live player, so
+# ghosts that boosted more pull ahead.
+from array import array
+
+import pygame
+
+from constants import *
+from replay import InputLog, ReplayError, replay
+from timestep import lerp
+
+MAX_GHOSTS = 100
+GHOST_ALPHA = 90  # Out of 255
+GHOST_MARGIN = PLAYER_SIZE  # Ghosts this far off screen are still drawn
+
+
+class GhostTrack:
+    __slots__ = ("distance", "y", "frame")
+
+    def __init__(self):
+        self.distance = array("I")
+        self.y = array("h")
+        self.frame = array("B")  # Rotation frame index, as in RotationFrames
+
+    def __len__(self):
+        return len(self.y)
+
+    def record(self, sim):
+        player = sim.player
+        self.distance.append(sim.distance)
+        self.y.append(player.rect.y)
+        self.frame.append(round(player.rotation / ROTATION_SPEED) % ROTATION_STEPS)
+
+
+def tracks_from_log(log, level=None):
+    # One track per run in the log, from its first tick to the tick it ended
+    # on, by death or by reaching the end of a level
+    tracks = []
+    was_active = False
+
+    def on_step(sim):
+        nonlocal was_active
+        active = sim.game_active
+        if active and not was_active:
+            tracks.append(GhostTrack())
+        if active or EVENT_DEATH in sim.events or EVENT_LEVEL_COMPLETE in sim.events:
+            tracks[-1].record(sim)
+        was_active = active
+
+    replay(log, level, on_step)
+    return tracks
+
+
+def load_ghosts(paths, level=None):
+    # GhostRace over the runs in the given input log files, up to MAX_GHOSTS.
+    # A log that can't be read or doesn't replay on this level (recorded in
+    # random mode or on another level) is skipped and listed in the race's
+    # skipped, so one bad file doesn't cost every other ghost.
+    tracks = []
+    skipped = []
+    for path in paths:
+        try:
+            tracks.extend(tracks_from_log(InputLog.load(path), level))
+        except (ReplayError, OSError) as e:
+            skipped.append((path, e))
+            continue
+        if len(tracks) >= MAX_GHOSTS:
+            break
+    return GhostRace(tracks, skipped)
+
+
+def make_ghost_image(image):
+    # Translucent copy of a character image
+    ghost = image.copy()
+    ghost.fill((255, 255, 255, GHOST_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+    return ghost
+
+
+class GhostRace:
+    def __init__(self, tracks, skipped=()):
+        self.tracks = tracks[:MAX_GHOSTS]
+        self.skipped = list(skipped)  # (path, exception) of logs left out
+        self.start_tick = 0
+
+    def start(self, tick):
+        # Called when the live run starts; ghost tick 0 is the tick after
+        self.start_tick = tick
+
+    def draw(self, surface, sim, frames, alpha=1.0, want_rect=False):
+        # frames is the shared RotationFrames of the ghost image. Returns the
+        # bounding rect of everything drawn when want_rect is set.
+        if not sim.game_active and not sim.game_over:
+            return None
+        k = sim.tick - self.start_tick - 1
+        if k < 0:
+            return None
+        frame_list = frames.frames
+        live = sim.distance
+        half = PLAYER_SIZE // 2
+        left = -GHOST_MARGIN - PLAYER_X
+        right = SCREEN_WIDTH + GHOST_MARGIN - PLAYER_X
+        blits = []
+        for track in self.tracks:
+            if k >= len(track.y):
+                continue
+            offset = track.distance[k] - live
+            if offset < left or offset > right:
+                continue
+            ys = track.y
+            y = ys[k] if k == 0 else round(lerp(ys[k - 1], ys[k], alpha))
+            image, (ox, oy) = frame_list[track.frame[k]]
+            blits.append((image, (PLAYER_X + offset + half + ox, y + half + oy)))
+        if not blits:
+            return None
+        if want_rect:
+            rects = surface.blits(blits)
+            return rects[0].unionall(rects)
+        surface.blits(blits, doreturn=False)
+        return None
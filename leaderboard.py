@@ -0,0 +1,350 @@
+# Cloud leaderboard client.
+#
+# record() is all the game loop ever calls: it appends the finished run to an
+# in-memory deque and wakes a background worker, so a slow or unreachable
+# server can never stall a frame. The worker
+#
+#   - appends new runs to a durable NDJSON queue file before anything is sent,
+#     so runs survive crashes, restarts and days offline;
+#   - submits the queue in batches of up to LEADERBOARD_BATCH runs as
+#     POST /runs over one keep-alive HTTP connection that it reuses for every
+#     request, reconnecting only when the server drops it;
+#   - on failure keeps the runs queued and retries with exponential backoff
+#     or after the server's Retry-After, both with random jitter, so a fleet
+#     of kiosks that lost the server together doesn't come back in lockstep;
+#   - after each successful submit, and every LEADERBOARD_REFRESH seconds,
+#     fetches GET /leaderboard?limit=N and caches the board in memory and on
+#     disk for the game-over screen.
+#
+# Every run carries a random id, so a batch that is sent twice (the reply was
+# lost, or a reused connection died mid-request) is only counted once.
+#
+#   POST /runs         {"runs": [{"id": ..., "name": ..., "score": 12,
+#                                 "seed": 34, "duration": 56.7, "time": ...}]}
+#   GET /leaderboard   {"top": [{"name": ..., "score": 12, ...}, ...]}
+#
+# python leaderboard.py serve [--port N] [--fail-rate F] runs an in-memory
+# stand-in server with the same API for development and testing.
+import http.client
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from urllib.parse import urlsplit
+
+LEADERBOARD_QUEUE = "leaderboard_queue.ndjson"
+LEADERBOARD_BOARD = "leaderboard_board.json"
+LEADERBOARD_SIZE = 10  # Entries fetched and cached
+LEADERBOARD_BATCH = 50  # Runs per request
+LEADERBOARD_QUEUE_LIMIT = 10000  # Oldest runs are dropped beyond this
+LEADERBOARD_REFRESH = 60  # Seconds between board refreshes
+LEADERBOARD_TIMEOUT = 5  # Seconds per connect or read
+LEADERBOARD_BACKOFF = 2  # First retry delay in seconds, doubled per failure...
+LEADERBOARD_MAX_BACKOFF = 300  # ...up to this
+LEADERBOARD_CLOSE_TIMEOUT = 2  # Seconds close() waits for the worker
+
+
+class LeaderboardError(Exception):
+    pass
+
+
+def board_entries(entries):
+    # Only entries the game-over screen can draw; anything else from the
+    # server or the cache file is dropped rather than stored
+    return [entry for entry in entries
+            if isinstance(entry, dict) and isinstance(entry.get("name"), str)
+            and type(entry.get("score")) is int]
+
+
+class Leaderboard:
+    def __init__(self, url, name=None, queue_path=LEADERBOARD_QUEUE, board_path=LEADERBOARD_BOARD,
+                 size=LEADERBOARD_SIZE, batch_size=LEADERBOARD_BATCH, refresh=LEADERBOARD_REFRESH,
+                 timeout=LEADERBOARD_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise LeaderboardError(f"Unsupported leaderboard URL {url!r}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.name = name or socket.gethostname()
+        self.queue_path = queue_path
+        self.board_path = board_path
+        self.size = size
+        self.batch_size = batch_size
+        self.refresh = refresh
+        self.timeout = timeout
+
+        # Filled by record() on the game thread, drained by the worker
+        self.new_runs = deque()
+        # Owned by the worker: runs on disk that the server hasn't accepted
+        self.queue = self.load_queue()
+        # Replaced whole by the worker, so the game thread can read it any time
+        self.board = self.load_board()
+        self.connection = None
+        self.failures = 0
+        self.retry_at = 0
+        self.board_due = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def record(self, score, seed, duration):
+        # duration is in seconds
+        self.new_runs.append({"id": uuid.uuid4().hex, "name": self.name, "score": score, "seed": seed,
+                              "duration": round(duration, 2), "time": time.time()})
+        self.wake.set()
+
+    def top(self):
+        # Cached board, best first; may be from a previous session
+        return self.board
+
+    def close(self):
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(LEADERBOARD_CLOSE_TIMEOUT)
+
+    # Worker thread
+
+    def run(self):
+        while True:
+            self.take_new_runs()
+            if self.stopping:
+                break
+            now = time.monotonic()
+            if self.queue and now >= self.retry_at:
+                self.submit_queue()
+            if now >= self.board_due and now >= self.retry_at:
+                self.refresh_board()
+            now = time.monotonic()
+            due = self.board_due if not self.queue else min(self.board_due, self.retry_at)
+            self.wake.wait(max(0, due - now))
+            self.wake.clear()
+        if self.connection:
+            self.connection.close()
+
+    def take_new_runs(self):
+        runs = []
+        while self.new_runs:
+            runs.append(self.new_runs.popleft())
+        if not runs:
+            return
+        self.queue.extend(runs)
+        if len(self.queue) > LEADERBOARD_QUEUE_LIMIT:
+            del self.queue[:len(self.queue) - LEADERBOARD_QUEUE_LIMIT]
+            self.save_queue()
+        else:
+            self.append_queue(runs)
+
+    def submit_queue(self):
+        while self.queue and not self.stopping:
+            batch = self.queue[:self.batch_size]
+            body = json.dumps({"runs": batch}, separators=(",", ":")).encode()
+            try:
+                status, retry_after, _ = self.request("POST", "/runs", body)
+            except (OSError, http.client.HTTPException):
+                self.back_off()
+                return
+            if status >= 500 or status in (408, 429):
+                self.back_off(retry_after)
+                return
+            if status >= 400:
+                # The server will never take these; retrying would block the queue
+                self.rejected += len(batch)
+            else:
+                self.submitted += len(batch)
+            del self.queue[:len(batch)]
+            self.save_queue()
+            self.failures = 0
+            # Show the new scores on the next game-over screen
+            self.board_due = 0
+
+    def refresh_board(self):
+        try:
+            status, retry_after, data = self.request("GET", f"/leaderboard?limit={self.size}")
+            if status != 200:
+                raise ValueError(status)
+            board = board_entries(json.loads(data)["top"])[:self.size]
+        except (OSError, http.client.HTTPException, ValueError, KeyError, TypeError):
+            # Keep showing the cached board; try again at the next refresh
+            self.board_due = time.monotonic() + self.refresh
+            return
+        self.board = board
+        self.board_due = time.monotonic() + self.refresh * random.uniform(0.9, 1.1)
+        self.save_board()
+
+    def back_off(self, retry_after=None):
+        self.failures += 1
+        try:
+            # The server's Retry-After is the same for every kiosk, so it is
+            # spread too, upwards since it is the earliest it wants us back
+            delay = float(retry_after) * random.uniform(1.0, 1.5)
+        except (TypeError, ValueError):
+            delay = min(LEADERBOARD_BACKOFF * 2 ** (self.failures - 1), LEADERBOARD_MAX_BACKOFF)
+            delay *= random.uniform(0.5, 1.0)
+        self.retry_at = time.monotonic() + delay
+
+    def connect(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None):
+        # Returns (status, Retry-After header, body) over the shared connection
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        while True:
+            fresh = self.connection is None
+            if fresh:
+                self.connection = self.connect()
+            connection = self.connection
+            try:
+                connection.request(method, self.base_path + path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                self.connection = None
+                if fresh:
+                    raise
+                # The server closed the idle connection; once more on a new one
+                continue
+            if response.will_close:
+                connection.close()
+                self.connection = None
+            return response.status, response.getheader("Retry-After"), data
+
+    # Files; only the worker writes them after __init__
+
+    def load_queue(self):
+        runs = []
+        try:
+            with open(self.queue_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        runs.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash mid-append
+                        pass
+        except FileNotFoundError:
+            pass
+        return runs[-LEADERBOARD_QUEUE_LIMIT:]
+
+    def append_queue(self, runs):
+        try:
+            with open(self.queue_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(run, separators=(",", ":")) + "\n" for run in runs))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            # Unwritable disk: the runs are still queued in memory
+            pass
+
+    def save_queue(self):
+        # Rewritten whole and swapped in, so a crash leaves the old or new queue
+        temp_path = self.queue_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(run, separators=(",", ":")) + "\n" for run in self.queue))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.queue_path)
+        except OSError:
+            pass
+
+    def load_board(self):
+        try:
+            with open(self.board_path, encoding="utf-8") as f:
+                return board_entries(json.load(f))[:self.size]
+        except (OSError, ValueError, TypeError):
+            return []
+
+    def save_board(self):
+        temp_path = self.board_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.board, f)
+            os.replace(temp_path, self.board_path)
+        except OSError:
+            # Only a cache
+            pass
+
+
+def serve(port=8000, fail_rate=0.0):
+    # In-memory stand-in for the leaderboard service. Runs are deduplicated
+    # by id; fail_rate answers that share of submissions with a 503.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    runs = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive
+
+        def reply(self, status, payload=None):
+            body = json.dumps(payload or {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 503:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path != "/runs":
+                return self.reply(404)
+            if random.random() < fail_rate:
+                return self.reply(503)
+            try:
+                batch = json.loads(body)["runs"]
+                with lock:
+                    for run in batch:
+                        runs[run["id"]] = run
+            except (ValueError, KeyError, TypeError):
+                return self.reply(400)
+            self.reply(200, {"accepted": len(batch)})
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path != "/leaderboard":
+                return self.reply(404)
+            limit = LEADERBOARD_SIZE
+            for field in query.split("&"):
+                key, _, value = field.partition("=")
+                if key == "limit" and value.isdigit():
+                    limit = int(value)
+            with lock:
+                top = sorted(runs.values(), key=lambda run: -run["score"])[:limit]
+            self.reply(200, {"top": top})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    # python leaderboard.py serve [--port N] [--fail-rate F]
+    def option(name, default=None):
+        if name in sys.argv:
+            return sys.argv[sys.argv.index(name) + 1]
+        return default
+
+    if sys.argv[1:2] != ["serve"]:
+        sys.exit("usage: python leaderboard.py serve [--port N] [--fail-rate F]")
+    server = serve(int(option("--port", 8000)), float(option("--fail-rate", 0)))
+    print(f"Leaderboard stand-in on http://localhost:{server.server_address[1]}")
+    server.serve_forever()
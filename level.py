@@ -0,0 +1,300 @@
+# Authored and pre-generated levels in a compact, chunked binary format.
+#
+# A level is a list of obstacles and coins at fixed world x positions, sorted
+# by x. The file is memory-mapped and split into chunks of LEVEL_CHUNK_WIDTH
+# world pixels; a small per-chunk index maps x to the chunk's records, so a
+# LevelStream only ever decodes the chunk the camera is currently in and the
+# Simulation only materialises objects as they scroll on screen. Memory use is
+# the same for a level of one screen or a million.
+#
+# Coin positions are chosen when the level is generated or authored, so
+# playing a level never runs the random game's per-spawn obstacle scan.
+#
+# Binary layout (little endian):
+#   header   b"CDLV", version (u8), chunk width, chunk count, record count,
+#            level length (u32 each)
+#   index    per chunk: start x, first record, record count (u32 each)
+#   records  x (u32), kind (u8), width (u8), height (u8), color (u8), y (u16)
+#            kind is OBSTACLE_TRIANGLE, OBSTACLE_PLATFORM or LEVEL_COIN; color
+#            indexes NEON_COLORS; y is only used by coins. Records are
+#            checked as each chunk is decoded.
+#
+# Text levels (one object per line, "#" starts a comment) are compiled with
+# python level.py build level.txt level.cdlv:
+#   triangle X [COLOR]
+#   platform X [COLOR]
+#   coin X Y
+# X is 0 to LEVEL_MAX_X, Y a screen row.
+import bisect
+import mmap
+import os
+import random
+import struct
+import sys
+
+from constants import *
+
+LEVEL_MAGIC = b"CDLV"
+LEVEL_VERSION = 1
+LEVEL_HEADER = struct.Struct("<4sBIIII")
+LEVEL_INDEX_ENTRY = struct.Struct("<III")
+LEVEL_RECORD = struct.Struct("<IBBBBH")
+LEVEL_CHUNK_WIDTH = 2048  # World pixels per chunk
+LEVEL_COIN = 2  # Record kind for coins, after the obstacle types
+# Leaves room in the u32 fields for the level length and for coins moved
+# forward to a safe slot
+LEVEL_MAX_X = 2 ** 31
+
+# Spacing that matches the random game at normal speed
+OBSTACLE_SPACING = (OBSTACLE_FREQUENCY_TICKS + 1) * GAME_SPEED
+COIN_SPACING = (BOOST_FREQUENCY_TICKS + 1) * GAME_SPEED
+COIN_RETRY_SPACING = COIN_RETRY_DELAY_TICKS * GAME_SPEED
+
+OBSTACLE_SIZES = {
+    OBSTACLE_TRIANGLE: (40, 40),
+    OBSTACLE_PLATFORM: (80, 30),
+}
+OBSTACLE_NAMES = {"triangle": OBSTACLE_TRIANGLE, "platform": OBSTACLE_PLATFORM}
+
+
+class LevelError(Exception):
+    pass
+
+
+def check_record(record):
+    # Every record the Simulation can spawn; anything else is a damaged or
+    # hand-edited level
+    x, kind, width, height, color, y = record
+    if kind == LEVEL_COIN:
+        if not 0 <= y < SCREEN_HEIGHT:
+            raise LevelError(f"Coin at x {x} has y {y} off screen")
+    elif kind in OBSTACLE_SIZES:
+        if not 0 <= color < len(NEON_COLORS):
+            raise LevelError(f"Obstacle at x {x} has no color {color}")
+        if not (0 < width <= SCREEN_WIDTH and 0 < height <= SCREEN_HEIGHT):
+            raise LevelError(f"Obstacle at x {x} has size {width}x{height}")
+    else:
+        raise LevelError(f"Record at x {x} has unknown kind {kind}")
+
+
+def safe_coin_slot(obstacle_xs, x):
+    # No obstacle may start within COIN_MIN_DISTANCE of the coin, the rule
+    # the random game applies when it spawns one; obstacle_xs is sorted
+    i = bisect.bisect_right(obstacle_xs, x - COIN_MIN_DISTANCE)
+    return i == len(obstacle_xs) or obstacle_xs[i] >= x + COIN_MIN_DISTANCE
+
+
+def place_coins(obstacle_xs, candidates):
+    # Move each (x, y) candidate forward until it sits in a safe slot
+    coins = []
+    for x, y in candidates:
+        while not safe_coin_slot(obstacle_xs, x):
+            x += COIN_RETRY_SPACING
+        coins.append((x, y))
+    return coins
+
+
+def generate_level(seed, length):
+    # A random level paced like the endless game: (obstacles, coins) where
+    # obstacles are (x, type, width, height, color) and coins are (x, y)
+    rng = random.Random(seed)
+    obstacles = []
+    for x in range(SCREEN_WIDTH, length, OBSTACLE_SPACING):
+        obstacle_type = rng.choice([OBSTACLE_TRIANGLE, OBSTACLE_PLATFORM])
+        width, height = OBSTACLE_SIZES[obstacle_type]
+        obstacles.append((x, obstacle_type, width, height, rng.randrange(len(NEON_COLORS))))
+
+    candidates = [(x, rng.choice(COIN_POSITIONS)) for x in range(SCREEN_WIDTH + COIN_SPACING, length, COIN_SPACING)]
+    coins = place_coins([obstacle[0] for obstacle in obstacles], candidates)
+    return obstacles, [coin for coin in coins if coin[0] < length]
+
+
+def parse_level_text(text):
+    obstacles = []
+    candidates = []
+    for number, line in enumerate(text.splitlines(), 1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        try:
+            x = int(fields[1])
+            if fields[0] == "coin":
+                y = int(fields[2])
+                if not 0 <= y < SCREEN_HEIGHT:
+                    raise LevelError(f"Line {number}: coin y {y} is off screen in {line.strip()!r}")
+                candidates.append((x, y))
+            else:
+                obstacle_type = OBSTACLE_NAMES[fields[0]]
+                color = int(fields[2]) if len(fields) > 2 else 0
+                if not 0 <= color < len(NEON_COLORS):
+                    raise LevelError(f"Line {number}: no color {color} in {line.strip()!r}")
+                width, height = OBSTACLE_SIZES[obstacle_type]
+                obstacles.append((x, obstacle_type, width, height, color))
+        except (KeyError, IndexError, ValueError):
+            raise LevelError(f"Line {number}: cannot parse {line.strip()!r}")
+        if not 0 <= x <= LEVEL_MAX_X:
+            raise LevelError(f"Line {number}: x {x} is outside 0 to {LEVEL_MAX_X} in {line.strip()!r}")
+    obstacles.sort()
+    # Authored coins get the same safety check as generated ones
+    coins = place_coins([obstacle[0] for obstacle in obstacles], sorted(candidates))
+    return obstacles, coins
+
+
+def level_bytes(obstacles, coins, chunk_width=LEVEL_CHUNK_WIDTH):
+    records = [(x, kind, width, height, color, 0) for x, kind, width, height, color in obstacles]
+    records += [(x, LEVEL_COIN, COIN_SIZE, COIN_SIZE, 0, y) for x, y in coins]
+    records.sort()
+    length = records[-1][0] + SCREEN_WIDTH if records else SCREEN_WIDTH
+    if records and (records[0][0] < 0 or records[-1][0] > LEVEL_MAX_X):
+        raise LevelError(f"Objects must lie between x 0 and {LEVEL_MAX_X}")
+    for record in records:
+        check_record(record)
+
+    # Chunk i holds the records with i * chunk_width <= x < (i + 1) * chunk_width
+    chunk_count = length // chunk_width + 1
+    index = bytearray()
+    first = 0
+    for chunk in range(chunk_count):
+        end = bisect.bisect_left(records, ((chunk + 1) * chunk_width,))
+        index += LEVEL_INDEX_ENTRY.pack(chunk * chunk_width, first, end - first)
+        first = end
+
+    out = bytearray(LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, chunk_width, chunk_count, len(records), length))
+    out += index
+    for record in records:
+        out += LEVEL_RECORD.pack(*record)
+    return bytes(out)
+
+
+def write_level(path, obstacles, coins, chunk_width=LEVEL_CHUNK_WIDTH):
+    with open(path, "wb") as f:
+        f.write(level_bytes(obstacles, coins, chunk_width))
+
+
+class LevelFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size < LEVEL_HEADER.size:
+                raise LevelError("Truncated level file")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.read_index()
+        except LevelError:
+            self.data.close()
+            raise
+
+    def read_index(self):
+        magic, version, self.chunk_width, self.chunk_count, self.record_count, self.length = \
+            LEVEL_HEADER.unpack_from(self.data)
+        if magic != LEVEL_MAGIC:
+            raise LevelError("Not a Cloud Dash level")
+        if version != LEVEL_VERSION:
+            raise LevelError(f"Unsupported level version {version}")
+
+        # The index is the only part read up front
+        self.chunk_starts = []
+        self.chunk_firsts = []
+        self.chunk_counts = []
+        pos = LEVEL_HEADER.size
+        if pos + self.chunk_count * LEVEL_INDEX_ENTRY.size > len(self.data):
+            raise LevelError("Truncated level index")
+        for _ in range(self.chunk_count):
+            start, first, count = LEVEL_INDEX_ENTRY.unpack_from(self.data, pos)
+            if first + count > self.record_count:
+                raise LevelError(f"Chunk at x {start} points past the last record")
+            self.chunk_starts.append(start)
+            self.chunk_firsts.append(first)
+            self.chunk_counts.append(count)
+            pos += LEVEL_INDEX_ENTRY.size
+        self.records_offset = pos
+        if pos + self.record_count * LEVEL_RECORD.size > len(self.data):
+            raise LevelError("Truncated level file")
+
+    def chunk(self, number):
+        # Decoded records of one chunk, as (x, kind, width, height, color, y);
+        # raises LevelError for a record the Simulation could not spawn
+        start = self.records_offset + self.chunk_firsts[number] * LEVEL_RECORD.size
+        end = start + self.chunk_counts[number] * LEVEL_RECORD.size
+        records = list(LEVEL_RECORD.iter_unpack(self.data[start:end]))
+        for record in records:
+            check_record(record)
+        return records
+
+    def close(self):
+        self.data.close()
+
+
+class LevelStream:
+    # Hands out a level's records in x order as the camera reaches them,
+    # keeping only the current chunk decoded. The position is a record
+    # number, which is what Simulation snapshots keep.
+    def __init__(self, level):
+        self.level = level
+        self.seek(0)
+
+    def seek(self, record):
+        level = self.level
+        self.record = record
+        if level.chunk_count:
+            self.chunk = bisect.bisect_right(level.chunk_firsts, record) - 1
+            self.records = level.chunk(self.chunk)
+            self.pos = record - level.chunk_firsts[self.chunk]
+        else:
+            self.chunk = 0
+            self.records = []
+            self.pos = 0
+
+    def take(self, limit):
+        # Records with x <= limit that have not been handed out yet
+        level = self.level
+        taken = []
+        while True:
+            if self.pos < len(self.records):
+                record = self.records[self.pos]
+                if record[0] > limit:
+                    return taken
+                taken.append(record)
+                self.pos += 1
+                self.record += 1
+            elif self.chunk + 1 < level.chunk_count and level.chunk_starts[self.chunk + 1] <= limit:
+                # The camera has reached the next chunk
+                self.chunk += 1
+                self.records = level.chunk(self.chunk)
+                self.pos = 0
+            else:
+                return taken
+
+    @property
+    def exhausted(self):
+        return self.record >= self.level.record_count
+
+
+if __name__ == "__main__":
+    # python level.py generate OUT [--seed N] [--length PIXELS]
+    # python level.py build LEVEL.txt OUT
+    # python level.py info LEVEL
+    def option(name, default=None):
+        if name in sys.argv:
+            return sys.argv[sys.argv.index(name) + 1]
+        return default
+
+    command = sys.argv[1]
+    try:
+        if command == "generate":
+            path = sys.argv[2]
+            obstacles, coins = generate_level(int(option("--seed", 0)), int(option("--length", 1_000_000)))
+            write_level(path, obstacles, coins)
+        elif command == "build":
+            path = sys.argv[3]
+            with open(sys.argv[2]) as f:
+                obstacles, coins = parse_level_text(f.read())
+            write_level(path, obstacles, coins)
+        else:
+            path = sys.argv[2]
+        level = LevelFile(path)
+    except LevelError as error:
+        sys.exit(f"{sys.argv[2]}: {error}")
+    print(f"{path}: {level.record_count} objects over {level.length} px "
+          f"in {level.chunk_count} chunks of {level.chunk_width} px")
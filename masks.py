@@ -0,0 +1,72 @@
+# Pixel-perfect collision masks, built once and reused every tick.
+#
+# The player is a solid cube, so its mask for each of the 36 rotation steps is
+# a rotated filled square. Obstacle masks are keyed by (type, width, height).
+# A check is a bounding-rect test first and Mask.overlap() only for real
+# candidates, so precise collision costs about the same as the rect tests.
+import pygame
+
+from constants import *
+
+
+def build_player_frames(size=PLAYER_SIZE):
+    # (mask, offset_x, offset_y) per rotation step; offsets are from the
+    # player's centre to the rotated mask's top-left corner
+    square = pygame.Surface((size, size), pygame.SRCALPHA)
+    square.fill(WHITE)
+    frames = []
+    for step in range(ROTATION_STEPS):
+        rotated = pygame.transform.rotate(square, step * ROTATION_SPEED)
+        width, height = rotated.get_size()
+        frames.append((pygame.mask.from_surface(rotated), -(width // 2), -(height // 2)))
+    return frames
+
+
+def build_obstacle_mask(obstacle_type, width, height):
+    if obstacle_type == OBSTACLE_PLATFORM:
+        return pygame.mask.Mask((width, height), fill=True)
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.polygon(surface, WHITE, [(0, height), (width, height), (width // 2, 0)])
+    return pygame.mask.from_surface(surface)
+
+
+class CollisionMasks:
+    def __init__(self):
+        self.player_frames = build_player_frames()
+        self.obstacle_masks = {}
+        # How far a rotated player can reach past its unrotated rect
+        self.reach = max(-offset_x for _, offset_x, _ in self.player_frames) - PLAYER_SIZE // 2
+
+    def player_frame(self, rotation):
+        return self.player_frames[(rotation // ROTATION_SPEED) % ROTATION_STEPS]
+
+    def obstacle_mask(self, obstacle):
+        key = (obstacle.type, obstacle.width, obstacle.height)
+        mask = self.obstacle_masks.get(key)
+        if mask is None:
+            mask = self.obstacle_masks[key] = build_obstacle_mask(*key)
+        return mask
+
+    def collide(self, player, obstacle):
+        mask, offset_x, offset_y = self.player_frame(player.rotation)
+        left = player.rect.centerx + offset_x
+        top = player.rect.centery + offset_y
+        width, height = mask.get_size()
+        rect = obstacle.rect
+
+        # Bounding-rect gate before the mask test
+        if (left >= rect.right or rect.x >= left + width
+                or top >= rect.bottom or rect.y >= top + height):
+            return False
+        return mask.overlap(self.obstacle_mask(obstacle), (rect.x - left, rect.y - top)) is not None
+
+
+collision_masks = None
+
+
+def get_collision_masks():
+    # Built on first use so importing the simulation stays cheap
+    global collision_masks
+    if collision_masks is None:
+        collision_masks = CollisionMasks()
+    return collision_masks
@@ -0,0 +1,144 @@
+# Opt-in frame-time profiler.
+#
+# Phases are timed by wrapping bound methods on the objects being profiled
+# (instrument()), so nothing is timed, and nothing costs anything, unless a
+# profiler is attached; the simulation core itself never reads the clock.
+# Each timed call is one (frame, phase, start, duration) sample in a fixed-size
+# ring buffer, and frame intervals go into a second ring buffer that the
+# overlay summarises as p50/p95/p99 plus a dropped-frame count.
+#
+# export() writes the buffered samples as Chrome trace JSON (open in
+# chrome://tracing or Perfetto) when the path ends in .json, or as CSV.
+import csv
+import json
+import time
+
+from constants import RENDER_FPS
+
+FRAME_CAPACITY = 600  # 10 seconds at 60 FPS
+SAMPLE_CAPACITY = 1 << 16
+OVERLAY_REFRESH_FRAMES = 30  # Overlay text is re-rendered twice a second
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    def __init__(self, render_fps=RENDER_FPS, frame_capacity=FRAME_CAPACITY, sample_capacity=SAMPLE_CAPACITY):
+        # A frame is dropped when it takes longer than 1.5 frame budgets
+        self.budget_ns = 1_000_000_000 // (render_fps or RENDER_FPS)
+        self.frame_times = [0] * frame_capacity  # Frame intervals in ns
+        self.frame_capacity = frame_capacity
+        self.samples = [None] * sample_capacity
+        self.sample_capacity = sample_capacity
+        self.origin = time.perf_counter_ns()
+        self.reset()
+        self.overlay = None
+        self.overlay_frame = -OVERLAY_REFRESH_FRAMES
+
+    def reset(self):
+        self.frame = 0
+        self.frame_start = None
+        self.frame_count = 0  # Frame intervals recorded, may exceed capacity
+        self.sample_count = 0
+        self.dropped = 0
+
+    def begin_frame(self):
+        # Called once at the top of every frame; closes the previous one
+        now = time.perf_counter_ns()
+        if self.frame_start is not None:
+            interval = now - self.frame_start
+            self.frame_times[self.frame_count % self.frame_capacity] = interval
+            self.frame_count += 1
+            self.record("frame", self.frame_start, now)
+            if interval * 2 > self.budget_ns * 3:
+                self.dropped += 1
+            self.frame += 1
+        self.frame_start = now
+
+    def record(self, phase, start, end):
+        self.samples[self.sample_count % self.sample_capacity] = (self.frame, phase, start, end - start)
+        self.sample_count += 1
+
+    def timed(self, phase, function):
+        record = self.record
+        clock = time.perf_counter_ns
+
+        def timed_call(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(phase, start, clock())
+        return timed_call
+
+    def instrument(self, obj, phases):
+        # phases maps method name -> phase name; the timed wrapper is set on
+        # the instance and shadows the class method
+        for name, phase in phases.items():
+            setattr(obj, name, self.timed(phase, getattr(obj, name)))
+
+    def recent_samples(self):
+        # Buffered samples, oldest first
+        count = min(self.sample_count, self.sample_capacity)
+        start = self.sample_count - count
+        return [self.samples[i % self.sample_capacity] for i in range(start, self.sample_count)]
+
+    def frame_percentiles(self):
+        # (p50, p95, p99) of the buffered frame intervals in milliseconds
+        count = min(self.frame_count, self.frame_capacity)
+        times = sorted(self.frame_times[:count])
+        return tuple(percentile(times, fraction) / 1e6 for fraction in (0.50, 0.95, 0.99))
+
+    def phase_means(self):
+        # Mean duration per call in milliseconds for each phase
+        totals = {}
+        for _, phase, _, duration in self.recent_samples():
+            total = totals.get(phase)
+            if total is None:
+                totals[phase] = [duration, 1]
+            else:
+                total[0] += duration
+                total[1] += 1
+        return {phase: duration / count / 1e6 for phase, (duration, count) in totals.items()}
+
+    def draw_overlay(self, surface, font, topleft=(10, 40)):
+        # Returns the rect drawn so dirty rectangle rendering can track it
+        if self.frame - self.overlay_frame >= OVERLAY_REFRESH_FRAMES or self.overlay is None:
+            self.overlay_frame = self.frame
+            p50, p95, p99 = self.frame_percentiles()
+            text = f"p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms  dropped {self.dropped}"
+            self.overlay = font.render(text, True, OVERLAY_COLOR, OVERLAY_BACKGROUND)
+        return surface.blit(self.overlay, topleft)
+
+    def export(self, path):
+        samples = self.recent_samples()
+        if path.endswith(".json"):
+            self.export_chrome_trace(path, samples)
+        else:
+            self.export_csv(path, samples)
+
+    def export_chrome_trace(self, path, samples):
+        # Complete ("X") events; timestamps are microseconds since the
+        # profiler was created
+        origin = self.origin
+        events = [{"name": phase, "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - origin) / 1000, "dur": duration / 1000, "args": {"frame": frame}}
+                  for frame, phase, start, duration in samples]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path, samples):
+        origin = self.origin
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "phase", "start_us", "duration_us"])
+            for frame, phase, start, duration in samples:
+                writer.writerow([frame, phase, (start - origin) / 1000, duration / 1000])
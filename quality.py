@@ -0,0 +1,145 @@
+# Adaptive render quality.
+#
+# A QualityGovernor watches how long each frame's work takes (events, update,
+# draw and present, not the wait for the next frame) against the frame budget
+# and moves between quality levels, cheapest savings first:
+#
+#   QUALITY_FULL         everything on
+#   QUALITY_NO_GLOWS     obstacles and coins without their glow
+#   QUALITY_NO_EFFECTS   also no shield and boost circles around the player
+#   QUALITY_HALF_RES     also the world drawn at half resolution and scaled up
+#
+# It steps down as soon as too many frames of a one-second window ran over
+# budget, and only steps back up after several windows in a row finished well
+# inside it. A level that was left for being too slow soon after stepping up
+# to it waits twice as long before the next attempt, so a machine sitting on
+# the edge settles instead of flipping every few seconds.
+#
+# At half resolution the world is drawn into a ScaledTarget, a smaller surface
+# with its own scaled copy of every sprite, which is then scaled up onto the
+# screen in one call. That trades a quarter of the blending work for one
+# fixed-cost opaque copy, so it only pays off when blending is what is slow;
+# it is the last resort. The factor is a whole 2x because pygame's scaler is
+# several times slower at fractional factors. The HUD is still drawn at full
+# resolution.
+from collections import deque
+
+import pygame
+
+from constants import *
+
+QUALITY_FULL = 0
+QUALITY_NO_GLOWS = 1
+QUALITY_NO_EFFECTS = 2
+QUALITY_HALF_RES = 3
+QUALITY_LOWEST = QUALITY_HALF_RES
+QUALITY_NAMES = ["full", "no glows", "no effects", "half resolution"]
+QUALITY_RENDER_SCALE = 0.5
+
+QUALITY_WINDOW = 60  # Frames per measurement window
+QUALITY_SLOW_FRACTION = 0.2  # Step down when this share of a window is over budget
+QUALITY_HEADROOM = 0.6  # Frames must stay under this share of the budget...
+QUALITY_UP_WINDOWS = 3  # ...for this many windows in a row to step up
+QUALITY_MAX_UP_WINDOWS = 48  # Cap on the doubled wait after a failed step up
+
+
+class QualityGovernor:
+    def __init__(self, render_fps=RENDER_FPS, level=QUALITY_FULL, window=QUALITY_WINDOW):
+        self.budget_ms = 1000 / (render_fps or RENDER_FPS)
+        self.level = level
+        self.window = window
+        self.samples = deque(maxlen=window)
+        self.headroom_windows = 0
+        self.up_windows = QUALITY_UP_WINDOWS
+        self.stepped_up_at = None  # Frame of the last step up
+        self.frame = 0
+
+    def frame_done(self, work_ms):
+        # Returns the new level when it changes, otherwise None
+        self.frame += 1
+        samples = self.samples
+        samples.append(work_ms)
+        if len(samples) < self.window:
+            return None
+        budget = self.budget_ms
+        slow = sum(1 for ms in samples if ms > budget)
+        if slow > self.window * QUALITY_SLOW_FRACTION:
+            return self.step_down()
+        if max(samples) < budget * QUALITY_HEADROOM:
+            self.headroom_windows += 1
+            if self.headroom_windows >= self.up_windows:
+                return self.step_up()
+        else:
+            self.headroom_windows = 0
+        # The next window starts fresh
+        samples.clear()
+        return None
+
+    def step_down(self):
+        if (self.stepped_up_at is not None
+                and self.frame - self.stepped_up_at <= self.window * self.up_windows):
+            # The last step up did not hold: back off before trying again
+            self.up_windows = min(self.up_windows * 2, QUALITY_MAX_UP_WINDOWS)
+        self.stepped_up_at = None
+        return self.change(min(self.level + 1, QUALITY_LOWEST))
+
+    def step_up(self):
+        self.stepped_up_at = self.frame
+        return self.change(max(self.level - 1, QUALITY_FULL))
+
+    def change(self, level):
+        self.samples.clear()
+        self.headroom_windows = 0
+        if level == self.level:
+            return None
+        self.level = level
+        return level
+
+
+class ScaledTarget:
+    # Stands in for the screen while the world is drawn at a lower internal
+    # resolution of the given size. blit() and blits() take screen
+    # coordinates and full-size sprites; both are scaled on the way in, each
+    # sprite only once. Draws into surface if one of that size is given.
+    def __init__(self, size, surface=None):
+        width, height = size
+        self.scale_x = width / SCREEN_WIDTH
+        self.scale_y = height / SCREEN_HEIGHT
+        if surface is None:
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+        self.surface = surface
+        # id(sprite) -> (sprite, scaled copy); the sprite is kept so its id
+        # cannot be reused while the entry exists
+        self.scaled = {}
+
+    def sprite(self, image):
+        entry = self.scaled.get(id(image))
+        if entry is None or entry[0] is not image:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale_x)), max(1, round(height * self.scale_y)))
+            # The scaled copy keeps the sprite's pixel format
+            entry = self.scaled[id(image)] = (image, pygame.transform.smoothscale(image, size))
+        return entry[1]
+
+    def blit(self, source, dest):
+        # Returns the touched area in screen coordinates, like Surface.blit()
+        x, y = dest[0], dest[1]
+        self.surface.blit(self.sprite(source), (round(x * self.scale_x), round(y * self.scale_y)))
+        return pygame.Rect(x, y, *source.get_size())
+
+    def blits(self, blit_sequence, doreturn=True):
+        # Still a single Surface.blits() call on the scaled surface
+        scale_x = self.scale_x
+        scale_y = self.scale_y
+        sprite = self.sprite
+        self.surface.blits([(sprite(source), (round(x * scale_x), round(y * scale_y)))
+                            for source, (x, y) in blit_sequence], doreturn=False)
+        if doreturn:
+            return [pygame.Rect(x, y, *source.get_size()) for source, (x, y) in blit_sequence]
+        return None
+
+    def present(self, screen):
+        # Scale the finished world up over the whole screen
+        pygame.transform.scale(self.surface, screen.get_size(), screen)
@@ -0,0 +1,197 @@
+# Compact input recording and fast headless replay.
+#
+# A run is fully determined by its seed and the ticks at which the player
+# started, jumped and restarted, so that is all an input log stores. Replaying
+# re-simulates the log with the headless Simulation as fast as the CPU allows,
+# which is enough to verify a submitted score or reproduce a crash report.
+#
+# Binary layout (little endian):
+#   header  b"CDRL", version (u8), seed (u64), flags (u8)
+#   events  one varint per input: (ticks since previous input << 2) | kind
+#   footer  an INPUT_END event at the last recorded tick, then the final score
+#           as a varint
+import struct
+import sys
+
+from simulation import Simulation
+
+LOG_MAGIC = b"CDRL"
+LOG_VERSION = 2
+LOG_HEADER = struct.Struct("<4sBQB")
+LOG_HEADER_V1 = struct.Struct("<4sBQ")
+
+# Header flags
+FLAG_PRECISE_COLLISION = 1
+
+INPUT_JUMP = 0
+INPUT_START = 1
+INPUT_RESTART = 2
+INPUT_END = 3
+
+
+class ReplayError(Exception):
+    pass
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("Truncated input log")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class InputLog:
+    def __init__(self, seed, precise_collision=False):
+        self.seed = seed
+        self.precise_collision = precise_collision
+        self.inputs = []  # (tick, kind) in the order they were applied
+        self.end_tick = 0
+        self.score = 0
+
+    def record(self, tick, kind):
+        self.inputs.append((tick, kind))
+
+    def finish(self, tick, score):
+        self.end_tick = tick
+        self.score = score
+
+    def to_bytes(self):
+        flags = FLAG_PRECISE_COLLISION if self.precise_collision else 0
+        out = bytearray(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.seed, flags))
+        last_tick = 0
+        for tick, kind in self.inputs + [(self.end_tick, INPUT_END)]:
+            write_varint(out, (tick - last_tick) << 2 | kind)
+            last_tick = tick
+        write_varint(out, self.score)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < LOG_HEADER_V1.size:
+            raise ReplayError("Truncated input log")
+        magic, version, seed = LOG_HEADER_V1.unpack_from(data)
+        if magic != LOG_MAGIC:
+            raise ReplayError("Not a Cloud Dash input log")
+        if version == 1:
+            # Version 1 logs predate header flags
+            flags = 0
+            pos = LOG_HEADER_V1.size
+        elif version == LOG_VERSION:
+            if len(data) < LOG_HEADER.size:
+                raise ReplayError("Truncated input log")
+            flags = LOG_HEADER.unpack_from(data)[3]
+            pos = LOG_HEADER.size
+        else:
+            raise ReplayError(f"Unsupported input log version {version}")
+
+        log = cls(seed, bool(flags & FLAG_PRECISE_COLLISION))
+        tick = 0
+        while True:
+            value, pos = read_varint(data, pos)
+            tick += value >> 2
+            kind = value & 3
+            if kind == INPUT_END:
+                break
+            log.record(tick, kind)
+        log.end_tick = tick
+        log.score, pos = read_varint(data, pos)
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class InputRecorder:
+    # Records what a front end feeds into a Simulation. Calls mirror the
+    # simulation API: start()/restart() are recorded at the current tick,
+    # step(jump) at the tick the jump is applied from.
+    def __init__(self, sim):
+        self.sim = sim
+        self.log = InputLog(sim.seed, sim.precise_collision)
+
+    def start(self):
+        self.log.record(self.sim.tick, INPUT_START)
+
+    def restart(self):
+        self.log.record(self.sim.tick, INPUT_RESTART)
+
+    def jump(self):
+        self.log.record(self.sim.tick, INPUT_JUMP)
+
+    def finish(self):
+        self.log.finish(self.sim.tick, self.sim.score)
+        return self.log
+
+
+def replay(log, level=None, on_step=None):
+    # Re-simulate a log headlessly and return the final Simulation. Logs
+    # don't name the level they were played on; pass the same LevelFile.
+    # on_step(sim) is called after every tick.
+    sim = Simulation(log.seed, log.precise_collision, level)
+    inputs = log.inputs
+    count = len(inputs)
+    i = 0
+    while True:
+        tick = sim.tick
+        jump = False
+        while i < count and inputs[i][0] == tick:
+            kind = inputs[i][1]
+            if kind == INPUT_START:
+                sim.start()
+            elif kind == INPUT_RESTART:
+                sim.reset()
+            else:
+                jump = True
+            i += 1
+        # Time stops while the game is over, until the next restart
+        if tick >= log.end_tick or sim.game_over:
+            if i < count:
+                raise ReplayError(f"Input at tick {inputs[i][0]} after the run ended at tick {tick}")
+            return sim
+        sim.step(jump)
+        if on_step:
+            on_step(sim)
+
+
+def verify(log, score=None, level=None):
+    # True when replaying the log reproduces the claimed (or recorded) score
+    if score is None:
+        score = log.score
+    return replay(log, level).score == score
+
+
+if __name__ == "__main__":
+    # python replay.py [--level LEVEL] LOG...
+    args = sys.argv[1:]
+    level = None
+    if "--level" in args:
+        from level import LevelFile
+        i = args.index("--level")
+        level = LevelFile(args[i + 1])
+        del args[i:i + 2]
+    for path in args:
+        log = InputLog.load(path)
+        sim = replay(log, level)
+        status = "OK" if sim.score == log.score else "MISMATCH"
+        print(f"{path}: seed {log.seed}, {sim.tick} ticks, score {sim.score} "
+              f"(recorded {log.score}) {status}")
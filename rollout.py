@@ -0,0 +1,193 @@
+# Multi-process rollout farm for collecting experience on many cores.
+#
+#   with RolloutFarm(num_workers=8, envs_per_worker=64, seed=0) as farm:
+#       obs = farm.reset()
+#       for _ in range(10000):
+#           obs, rewards, dones = farm.step(policy(obs))
+#
+# Each worker process owns a contiguous slice of CloudDashEnv instances,
+# seeded seed, seed + 1, ... in order across the farm. Observations, rewards,
+# done flags, final scores and actions live in shared memory, so a step moves
+# no array data through pipes: the parent writes the whole action batch, sends
+# each worker a one-byte command and waits for one byte back. Games that end
+# are reset immediately by their worker; the returned observation is then the
+# first one of the new game, and episode_scores holds the finished game's
+# score for every index whose done flag is set.
+#
+# Returned arrays are views of the shared buffers and are overwritten by the
+# next step().
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from env import CloudDashEnv, OBSERVATION_FEATURES, PLAYER_FEATURES, OBSTACLE_FEATURES
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+
+COMMAND_STEP = b"s"
+COMMAND_RESET = b"r"
+COMMAND_CLOSE = b"c"
+REPLY_OK = b"k"
+
+
+def observation_spec(observation, lookahead, resolution):
+    # Shape and dtype of one environment's observation, without building it
+    if observation == OBSERVATION_FEATURES:
+        return (PLAYER_FEATURES + OBSTACLE_FEATURES * lookahead,), np.float32
+    width, height = resolution
+    return (height, width, 3), np.uint8
+
+
+class SharedArrays:
+    # Named NumPy arrays packed into a single shared memory block
+    def __init__(self, specs, name=None):
+        self.specs = specs
+        size = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in specs)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.arrays = {}
+        offset = 0
+        for key, shape, dtype in specs:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+            self.arrays[key] = array
+            offset += array.nbytes
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.arrays = {}
+        self.memory.close()
+
+
+def worker_main(connection, memory_name, specs, start, stop, seed, options):
+    shared = SharedArrays(specs, memory_name)
+    arrays = shared.arrays
+    observations = arrays["observations"]
+    rewards = arrays["rewards"]
+    dones = arrays["dones"]
+    episode_scores = arrays["episode_scores"]
+    actions = arrays["actions"]
+    envs = [CloudDashEnv(seed + index, **options) for index in range(start, stop)]
+    indices = range(start, stop)
+
+    try:
+        while True:
+            command = connection.recv_bytes()
+            if command == COMMAND_STEP:
+                for index, env in zip(indices, envs):
+                    obs, reward, done, info = env.step(actions[index])
+                    if done:
+                        # Auto-reset: hand back the first frame of the next game
+                        episode_scores[index] = info["score"]
+                        obs = env.reset()
+                    observations[index] = obs
+                    rewards[index] = reward
+                    dones[index] = done
+            elif command == COMMAND_RESET:
+                for index, env in zip(indices, envs):
+                    observations[index] = env.reset()
+                    rewards[index] = 0
+                    dones[index] = False
+            elif command == COMMAND_CLOSE:
+                break
+            connection.send_bytes(REPLY_OK)
+    except (EOFError, KeyboardInterrupt):
+        # Parent went away or the whole process group was interrupted
+        pass
+    finally:
+        del observations, rewards, dones, episode_scores, actions, arrays
+        shared.close()
+        connection.close()
+
+
+class RolloutFarm:
+    def __init__(self, num_workers=None, envs_per_worker=16, seed=0,
+                 observation=OBSERVATION_FEATURES, lookahead=3,
+                 resolution=(SCREEN_WIDTH, SCREEN_HEIGHT), frame_skip=1,
+                 precise_collision=False, start_method=None):
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        self.num_workers = num_workers
+        self.num_envs = num_workers * envs_per_worker
+        obs_shape, obs_dtype = observation_spec(observation, lookahead, resolution)
+        n = self.num_envs
+        specs = [
+            ("observations", (n,) + obs_shape, obs_dtype),
+            ("rewards", (n,), np.int32),
+            ("dones", (n,), np.bool_),
+            ("episode_scores", (n,), np.int64),
+            ("actions", (n,), np.uint8),
+        ]
+        self.shared = SharedArrays(specs)
+        arrays = self.shared.arrays
+        self.observations = arrays["observations"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+        self.episode_scores = arrays["episode_scores"]
+        self.actions = arrays["actions"]
+
+        options = {"observation": observation, "lookahead": lookahead, "resolution": resolution,
+                   "frame_skip": frame_skip, "precise_collision": precise_collision}
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.processes = []
+        self.closed = False
+        for worker in range(num_workers):
+            parent_end, child_end = context.Pipe()
+            start = worker * envs_per_worker
+            process = context.Process(
+                target=worker_main,
+                args=(child_end, self.shared.memory.name, specs, start, start + envs_per_worker, seed, options),
+                daemon=True)
+            process.start()
+            child_end.close()
+            self.connections.append(parent_end)
+            self.processes.append(process)
+
+    def broadcast(self, command):
+        # Send to every worker first so they all run in parallel, then wait
+        for connection in self.connections:
+            connection.send_bytes(command)
+        for connection in self.connections:
+            connection.recv_bytes()
+
+    def reset(self):
+        self.broadcast(COMMAND_RESET)
+        return self.observations
+
+    def step(self, actions):
+        # actions: one action per environment, any array-like of ints
+        self.actions[:] = actions
+        self.broadcast(COMMAND_STEP)
+        return self.observations, self.rewards, self.dones
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                connection.send_bytes(COMMAND_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for connection in self.connections:
+            connection.close()
+        del self.observations, self.rewards, self.dones, self.episode_scores, self.actions
+        self.shared.close()
+        self.shared.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
@@ -0,0 +1,525 @@
+# Pure Cloud Dash simulation core.
+#
+# Everything in here can be stepped without a window, an audio device or the
+# wall clock: time is counted in fixed ticks and only moves when
+# Simulation.step() is called. The pygame front end in geometry_dash.py draws
+# this state and feeds it input.
+import random
+
+from pygame import Rect
+
+from constants import *
+from masks import get_collision_masks
+from level import LevelStream, LEVEL_COIN
+
+
+class Player:
+    def __init__(self, image_path):
+        # Only the path is kept here; the renderer owns the loaded image
+        self.image_path = image_path
+        self.rect = Rect(PLAYER_X, GROUND_Y - PLAYER_SIZE, PLAYER_SIZE, PLAYER_SIZE)
+        # State at the previous tick, used for render interpolation
+        self.prev_y = self.rect.y
+        self.prev_rotation = 0
+        self.velocity_y = 0
+        self.is_jumping = False
+        self.jump_count = 0
+        self.rotation = 0
+        self.target_rotation = 0  # Target rotation for smooth animation
+        self.boost_active = False
+        self.boost_tick = 0
+        self.shield_active = False  # Shield protection from boost
+        self.score_multiplier = 1  # Default score multiplier
+
+    def jump(self):
+        if not self.is_jumping or self.jump_count < 2:  # Allow double jump
+            self.velocity_y = -JUMP_FORCE
+            self.is_jumping = True
+            self.jump_count += 1
+            # Always rotate clockwise by adding 90 to target_rotation
+            self.target_rotation = (self.target_rotation - 90) % 360
+            # Convert to negative value for clockwise rotation in pygame
+            if self.target_rotation > 0:
+                self.target_rotation -= 360
+            return True
+        return False
+
+    def update(self, tick):
+        self.prev_y = self.rect.y
+        self.prev_rotation = self.rotation
+
+        # Apply gravity
+        self.velocity_y += GRAVITY
+        self.rect.y += self.velocity_y
+
+        # Smooth rotation animation - always rotate clockwise
+        if self.rotation != self.target_rotation:
+            # Always rotate clockwise (decrease rotation value)
+            self.rotation -= ROTATION_SPEED
+
+            # Fix rotation if we passed the target
+            if self.rotation <= self.target_rotation:
+                self.rotation = self.target_rotation
+
+        # Check if player is on the ground
+        if self.rect.y >= GROUND_Y - self.rect.height:
+            self.rect.y = GROUND_Y - self.rect.height
+            self.velocity_y = 0
+            self.is_jumping = False
+            self.jump_count = 0
+
+        # Handle boost
+        if self.boost_active:
+            if tick - self.boost_tick > BOOST_DURATION_TICKS:
+                self.boost_active = False
+                self.shield_active = False
+                self.score_multiplier = 1  # Reset score multiplier when boost ends
+
+    def activate_boost(self, tick):
+        self.boost_active = True
+        self.shield_active = True  # Activate shield with boost
+        self.boost_tick = tick
+        self.score_multiplier = 2  # Double score when boost is active
+
+    def state(self):
+        # The player never moves horizontally, so only rect.y is kept
+        return (self.image_path, self.rect.y, self.prev_y, self.prev_rotation, self.velocity_y,
+                self.is_jumping, self.jump_count, self.rotation, self.target_rotation,
+                self.boost_active, self.boost_tick, self.shield_active, self.score_multiplier)
+
+    def set_state(self, state):
+        (self.image_path, self.rect.y, self.prev_y, self.prev_rotation, self.velocity_y,
+         self.is_jumping, self.jump_count, self.rotation, self.target_rotation,
+         self.boost_active, self.boost_tick, self.shield_active, self.score_multiplier) = state
+
+
+class Pool:
+    # Free list of retired entities. Obstacles and coins are recycled through
+    # spawn() instead of being reallocated, so long sessions don't churn the GC.
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+
+    def acquire(self, *args):
+        if self.free:
+            item = self.free.pop()
+            item.spawn(*args)
+            return item
+        return self.factory(*args)
+
+    def release(self, item):
+        self.free.append(item)
+
+    def restore(self, state):
+        # Like acquire(), but rebuilds a snapshotted entity without spawning
+        # (and so without drawing from the RNG)
+        if self.free:
+            item = self.free.pop()
+            item.set_state(state)
+            return item
+        return self.factory.from_state(state)
+
+
+class Obstacle:
+    __slots__ = ("type", "width", "height", "rect", "prev_x", "passed", "landed_on", "color")
+
+    def __init__(self, x, rng=random):
+        self.rect = Rect(0, 0, 0, 0)
+        self.spawn(x, rng)
+
+    def spawn(self, x, rng=random):
+        # Randomly choose obstacle type
+        self.type = rng.choice([OBSTACLE_TRIANGLE, OBSTACLE_PLATFORM])
+
+        if self.type == OBSTACLE_TRIANGLE:
+            # Triangle dimensions
+            self.width = 40
+            self.height = 40
+        else:
+            # Rectangle dimensions
+            self.width = 80
+            self.height = 30
+        self.rect.update(x, GROUND_Y - self.height, self.width, self.height)
+
+        self.prev_x = x
+        self.passed = False
+        self.landed_on = False  # Track if player has landed on this platform
+        self.color = rng.choice(NEON_COLORS)
+
+    @classmethod
+    def from_state(cls, state):
+        obstacle = cls.__new__(cls)
+        obstacle.rect = Rect(0, 0, 0, 0)
+        obstacle.set_state(state)
+        return obstacle
+
+    def state(self):
+        return (self.type, self.width, self.height, self.rect.x, self.prev_x,
+                self.passed, self.landed_on, self.color)
+
+    def set_state(self, state):
+        self.type, self.width, self.height, x, self.prev_x, self.passed, self.landed_on, self.color = state
+        self.rect.update(x, GROUND_Y - self.height, self.width, self.height)
+
+    def update(self, speed=GAME_SPEED):
+        self.prev_x = self.rect.x
+        self.rect.x -= speed
+
+    def check_collision(self, player_rect):
+        # For rectangle, use standard rect collision
+        if self.type == OBSTACLE_PLATFORM:
+            return player_rect.colliderect(self.rect)
+
+        # For triangle, check if player is inside the triangle
+        # First check if player rect overlaps with triangle rect (optimization)
+        if not player_rect.colliderect(self.rect):
+            return False
+
+        # Check if player's bottom points are inside the triangle
+        bottom_left = (player_rect.left + 5, player_rect.bottom - 5)
+        bottom_right = (player_rect.right - 5, player_rect.bottom - 5)
+
+        # Simple point in triangle check for bottom corners
+        return self.point_in_triangle(bottom_left) or self.point_in_triangle(bottom_right)
+
+    def point_in_triangle(self, point):
+        # Exact integer edge-function test: the point is inside (or on an
+        # edge) when it is on the same side of all three edges
+        px, py = point
+        rect = self.rect
+        x1, y1 = rect.x, rect.bottom
+        x2, y2 = rect.x + self.width, rect.bottom
+        x3, y3 = rect.x + self.width // 2, rect.top
+
+        d1 = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+        d2 = (x3 - x2) * (py - y2) - (y3 - y2) * (px - x2)
+        d3 = (x1 - x3) * (py - y3) - (y1 - y3) * (px - x3)
+
+        has_negative = d1 < 0 or d2 < 0 or d3 < 0
+        has_positive = d1 > 0 or d2 > 0 or d3 > 0
+        return not (has_negative and has_positive)
+
+
+class BoostItem:
+    __slots__ = ("rect", "prev_x", "collected", "animation_angle", "animation_speed")
+
+    def __init__(self, x, y=None):
+        self.rect = Rect(0, 0, COIN_SIZE, COIN_SIZE)
+        self.spawn(x, y)
+
+    def spawn(self, x, y=None):
+        # Allow custom y position or use default
+        if y is None:
+            y = COIN_POSITIONS[0]
+
+        self.rect.topleft = (x, y)
+        self.prev_x = x
+        self.collected = False
+        self.animation_angle = 0
+        self.animation_speed = 5  # Degrees per frame
+
+    @classmethod
+    def from_state(cls, state):
+        boost = cls.__new__(cls)
+        boost.rect = Rect(0, 0, COIN_SIZE, COIN_SIZE)
+        boost.set_state(state)
+        return boost
+
+    def state(self):
+        return (self.rect.x, self.rect.y, self.prev_x, self.collected,
+                self.animation_angle, self.animation_speed)
+
+    def set_state(self, state):
+        x, y, self.prev_x, self.collected, self.animation_angle, self.animation_speed = state
+        self.rect.topleft = (x, y)
+
+    def update(self, speed=GAME_SPEED):
+        self.prev_x = self.rect.x
+        self.rect.x -= speed
+
+        # Update animation angle for spinning effect
+        self.animation_angle = (self.animation_angle + self.animation_speed) % 360
+
+
+class Simulation:
+    def __init__(self, seed=None, precise_collision=False, level=None):
+        # Every random choice comes from this per-game RNG, so a seed plus
+        # the ticks of each input reproduce a run exactly
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Precise collision tests cached per-rotation player masks against
+        # obstacle masks instead of the classic rect / inset-corner rules
+        self.precise_collision = precise_collision
+        self.masks = get_collision_masks() if precise_collision else None
+        self.reach = self.masks.reach if precise_collision else 0
+        self.tick = 0  # Simulation ticks, advanced only by step()
+        # With a LevelFile, obstacles and coins come from the level instead
+        # of random spawns
+        self.level = level
+        self.stream = LevelStream(level) if level is not None else None
+        self.obstacle_pool = Pool(Obstacle)
+        self.boost_pool = Pool(BoostItem)
+        self.obstacles = []
+        self.boost_items = []
+        self.reset()
+        # A fresh simulation waits on the start menu until start() is called
+        self.game_active = False
+
+    def reset(self):
+        # Randomly choose between pixel.png and pixel_1.png for player character
+        self.player = Player(self.rng.choice(PLAYER_IMAGES))
+        # Hand the previous run's entities back to the pools
+        for obstacle in self.obstacles:
+            self.obstacle_pool.release(obstacle)
+        for boost in self.boost_items:
+            self.boost_pool.release(boost)
+        self.obstacles = []
+        self.boost_items = []
+        self.score = 0
+        self.game_over = False
+        self.game_active = True
+        self.last_obstacle_tick = self.tick
+        self.last_boost_tick = self.tick
+        # World x of the left edge of the screen, for levels
+        self.distance = 0
+        if self.stream is not None:
+            self.stream.seek(0)
+        # Events raised during the last step; cleared when the next one starts
+        self.events = []
+
+    def start(self):
+        if not self.game_active and not self.game_over:
+            self.game_active = True
+            return True
+        return False
+
+    def snapshot(self):
+        # Everything step() reads or writes, as plain nested tuples: no
+        # Surfaces and no shared mutable objects, so a snapshot can be kept,
+        # compared or pickled, and restored any number of times. seed and
+        # the collision mode are fixed per Simulation and not included.
+        return (self.tick, self.score, self.game_over, self.game_active,
+                self.last_obstacle_tick, self.last_boost_tick, self.distance,
+                self.stream.record if self.stream is not None else 0,
+                self.player.state(),
+                tuple([obstacle.state() for obstacle in self.obstacles]),
+                tuple([boost.state() for boost in self.boost_items]),
+                tuple(self.events),
+                self.rng.getstate())
+
+    def restore(self, snapshot):
+        (self.tick, self.score, self.game_over, self.game_active,
+         self.last_obstacle_tick, self.last_boost_tick, self.distance, level_record,
+         player, obstacles, boost_items, events, rng_state) = snapshot
+        if self.stream is not None:
+            self.stream.seek(level_record)
+        self.player.set_state(player)
+        # Current entities go back to the pools and are reused for the
+        # restored ones
+        obstacle_pool = self.obstacle_pool
+        for obstacle in self.obstacles:
+            obstacle_pool.release(obstacle)
+        self.obstacles[:] = [obstacle_pool.restore(state) for state in obstacles]
+        boost_pool = self.boost_pool
+        for boost in self.boost_items:
+            boost_pool.release(boost)
+        self.boost_items[:] = [boost_pool.restore(state) for state in boost_items]
+        self.events[:] = events
+        self.rng.setstate(rng_state)
+
+    def branch(self, sequences):
+        # Play each candidate sequence of jump flags from the current state
+        # and return (score, game_over, ticks played) for each, stopping a
+        # sequence early if it dies. The simulation is restored afterwards.
+        snapshot = self.snapshot()
+        start_tick = self.tick
+        results = []
+        for jumps in sequences:
+            for jump in jumps:
+                self.step(jump)
+                if self.game_over:
+                    break
+            results.append((self.score, self.game_over, self.tick - start_tick))
+            self.restore(snapshot)
+        return results
+
+    def step(self, jump=False):
+        self.events.clear()
+        self.tick += 1
+        if jump and self.game_active and self.player.jump():
+            # Jump only if game is active
+            self.events.append(EVENT_JUMP)
+        if self.game_over:
+            return
+
+        player = self.player
+        player.update(self.tick)
+
+        # Only update game elements if game is active
+        if not self.game_active:
+            return
+
+        # Determine current game speed
+        current_speed = BOOST_SPEED if player.boost_active else GAME_SPEED
+        current_tick = self.tick
+
+        if self.stream is not None:
+            self.spawn_level_objects()
+        else:
+            # Generate obstacles
+            if current_tick - self.last_obstacle_tick > OBSTACLE_FREQUENCY_TICKS:
+                self.obstacles.append(self.obstacle_pool.acquire(SCREEN_WIDTH, self.rng))
+                self.last_obstacle_tick = current_tick
+                self.events.append(EVENT_OBSTACLE_SPAWN)
+
+            # Generate boost items
+            if current_tick - self.last_boost_tick > BOOST_FREQUENCY_TICKS:
+                self.spawn_boost_item(current_tick)
+
+        self.update_obstacles(current_speed)
+
+        # Update boost items (only if game is still active)
+        if self.game_active:
+            self.update_boost_items(current_speed, current_tick)
+        self.distance += current_speed
+
+        # A level ends once everything in it has scrolled past
+        if (self.stream is not None and self.game_active and self.stream.exhausted
+                and not self.obstacles and not self.boost_items):
+            self.game_over = True
+            self.game_active = False
+            self.events.append(EVENT_LEVEL_COMPLETE)
+
+    def spawn_level_objects(self):
+        # Materialise every record that has reached the right edge of the
+        # screen; coin slots were made safe when the level was built
+        distance = self.distance
+        for x, kind, width, height, color, y in self.stream.take(distance + SCREEN_WIDTH):
+            x -= distance
+            if kind == LEVEL_COIN:
+                self.boost_items.append(self.boost_pool.restore((x, y, x, False, 0, 5)))
+                self.events.append(EVENT_COIN_SPAWN)
+            else:
+                state = (kind, width, height, x, x, False, False, NEON_COLORS[color])
+                self.obstacles.append(self.obstacle_pool.restore(state))
+                self.events.append(EVENT_OBSTACLE_SPAWN)
+
+    def update_boost_items(self, current_speed, current_tick):
+        player = self.player
+        boost_items = self.boost_items
+        # Survivors are compacted in place, so removal is O(n) with no copy
+        keep = 0
+        for boost in boost_items:
+            boost.update(current_speed)
+
+            # Check if player collected the boost
+            if not boost.collected and player.rect.colliderect(boost.rect):
+                boost.collected = True
+                player.activate_boost(current_tick)
+                self.events.append(EVENT_COIN_PICKUP)
+
+            # Remove boost items that are off-screen or collected
+            if boost.rect.right < 0 or boost.collected:
+                self.boost_pool.release(boost)
+                continue
+            boost_items[keep] = boost
+            keep += 1
+        del boost_items[keep:]
+
+    def spawn_boost_item(self, current_tick):
+        # Check if there's enough space for the coin (no obstacles nearby)
+        coin_x = SCREEN_WIDTH
+        # Alternate between high and low positions for coins
+        coin_y = self.rng.choice(COIN_POSITIONS)
+
+        # Create a temporary rect to check for collisions
+        temp_coin_rect = Rect(coin_x, coin_y, COIN_SIZE, COIN_SIZE)
+
+        for obstacle in self.obstacles:
+            # Check if any obstacle is too close to the coin position
+            if abs(obstacle.rect.x - coin_x) < COIN_MIN_DISTANCE:
+                break
+
+            # Project obstacle position to where it would be when coin arrives
+            if obstacle.rect.move(COIN_MIN_DISTANCE, 0).colliderect(temp_coin_rect):
+                break
+        else:
+            self.boost_items.append(self.boost_pool.acquire(coin_x, coin_y))
+            self.last_boost_tick = current_tick
+            self.events.append(EVENT_COIN_SPAWN)
+            return
+
+        # Delay coin generation by a bit to avoid obstacle
+        self.last_boost_tick = current_tick - (BOOST_FREQUENCY_TICKS - COIN_RETRY_DELAY_TICKS)
+
+    def check_collision(self, obstacle):
+        if self.masks is not None:
+            return self.masks.collide(self.player, obstacle)
+        return obstacle.check_collision(self.player.rect)
+
+    def update_obstacles(self, current_speed):
+        player = self.player
+        obstacles = self.obstacles
+        for obstacle in obstacles:
+            obstacle.update(current_speed)
+
+        # Broad phase: obstacles are spawned in x order and scroll together,
+        # so the list stays sorted by x. Everything the player has passed or
+        # could touch sits in a short run at the front; the scan stops at the
+        # first obstacle starting right of the player's (rotated) reach. Survivors of that run
+        # are compacted in place.
+        player_rect = player.rect
+        reach = self.reach
+        keep = 0
+        i = 0
+        count = len(obstacles)
+        while i < count:
+            obstacle = obstacles[i]
+            rect = obstacle.rect
+            if rect.x >= player_rect.right + reach:
+                break
+            i += 1
+
+            # Check if player passed the obstacle
+            if not obstacle.passed and rect.right < player_rect.left:
+                obstacle.passed = True
+                # Apply score multiplier when player has boost active
+                self.score += (1 * player.score_multiplier)
+
+            # Remove obstacles that are off-screen
+            if rect.right < 0:
+                self.obstacle_pool.release(obstacle)
+                continue
+
+            # Check for collisions
+            if rect.right > player_rect.left - reach and self.check_collision(obstacle):
+                # For platforms, check if player is landing on top
+                # (player's bottom near the platform's top, with small margin, and falling)
+                if (obstacle.type == OBSTACLE_PLATFORM and player_rect.bottom <= rect.top + 10
+                        and player.velocity_y > 0):
+                    # Land on platform
+                    player_rect.bottom = rect.top
+                    player.velocity_y = 0
+                    player.is_jumping = False
+                    player.jump_count = 0
+                    obstacle.landed_on = True
+
+                # For triangles or side collisions with platforms, it's game over or shield loss
+                elif player.shield_active:
+                    # Remove shield protection instead of game over
+                    player.shield_active = False
+                    self.obstacle_pool.release(obstacle)
+                    self.events.append(EVENT_SHIELD_BREAK)
+                    continue
+                else:
+                    if not self.game_over:
+                        self.events.append(EVENT_DEATH)
+                    self.game_over = True
+                    self.game_active = False
+
+            obstacles[keep] = obstacle
+            keep += 1
+        if keep < i:
+            del obstacles[keep:i]
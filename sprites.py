@@ -0,0 +1,134 @@
+# Pre-rendered sprite cache for the neon glow effects.
+#
+# Glows, fills and outlines used to be drawn into a fresh SRCALPHA Surface for
+# every object on every frame. Here each distinct (shape, color, size, glow)
+# combination is rendered once, converted to the display format and reused.
+import math
+
+import pygame
+
+from constants import *
+
+SHAPE_TRIANGLE = "triangle"
+SHAPE_RECT = "rect"
+SHAPE_CIRCLE = "circle"
+
+OBSTACLE_GLOW = 5  # Glow margin drawn around obstacles
+GLOW_ALPHA = 100
+SHIELD_COLOR = (0, 100, 255, 100)
+SHIELD_RADIUS = 25
+BOOST_GLOW_COLOR = (57, 255, 20, 80)
+BOOST_GLOW_RADIUS = 30
+
+# Coin glow pulses between 32 and 40 px as animation_angle moves in 5 degree
+# steps, so the whole animation is a small table of precomputed frames
+COIN_GLOW_SURFACE = (80, 80)
+COIN_ANIMATION_STEP = 5
+COIN_GLOW_SIZES = [36 + int(math.sin(math.radians(angle)) * 4)
+                   for angle in range(0, 360, COIN_ANIMATION_STEP)]
+COIN_BOUNCE_OFFSETS = [int(math.sin(math.radians(angle * 2)) * 3)
+                       for angle in range(0, 360, COIN_ANIMATION_STEP)]
+
+
+def build_sprite(shape, color, size, glow):
+    width, height = size
+    if shape == SHAPE_CIRCLE:
+        # Plain translucent circle of radius `glow` centred in the surface
+        sprite = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (width // 2, height // 2), glow)
+        return sprite
+
+    # Obstacle: glow, solid fill and white outline baked into one sprite
+    sprite = pygame.Surface((width + glow * 2, height + glow * 2), pygame.SRCALPHA)
+    glow_color = (*color[:3], GLOW_ALPHA)
+    if shape == SHAPE_TRIANGLE:
+        points = [
+            (glow, height + glow),
+            (width + glow, height + glow),
+            (width // 2 + glow, glow)
+        ]
+        pygame.draw.polygon(sprite, glow_color, points)
+        pygame.draw.polygon(sprite, color, points)
+        pygame.draw.polygon(sprite, WHITE, points, 2)
+    else:
+        body = (glow, glow, width, height)
+        pygame.draw.rect(sprite, glow_color, body)
+        pygame.draw.rect(sprite, color, body)
+        pygame.draw.rect(sprite, WHITE, body, 2)
+    return sprite
+
+
+def convert_for_display(sprite):
+    # convert_alpha() needs a display mode; headless callers skip it
+    if pygame.display.get_surface() is not None:
+        return sprite.convert_alpha()
+    return sprite
+
+
+class RotationFrames:
+    def __init__(self, image):
+        # Each frame is the rotated image plus the offset from the sprite's
+        # centre to the rotated image's top-left corner
+        self.frames = []
+        for step in range(ROTATION_STEPS):
+            rotated = convert_for_display(pygame.transform.rotate(image, step * ROTATION_SPEED))
+            width, height = rotated.get_size()
+            self.frames.append((rotated, (-(width // 2), -(height // 2))))
+
+    def get(self, rotation):
+        # Interpolated angles snap to the nearest precomputed frame
+        return self.frames[round(rotation / ROTATION_SPEED) % ROTATION_STEPS]
+
+
+class SpriteCache:
+    def __init__(self):
+        self.sprites = {}
+        # Rotation frames per character image; kept for the whole session so
+        # Game.reset() never rebuilds them
+        self.rotations = {}
+
+    def get(self, shape, color, size, glow):
+        key = (shape, color, size, glow)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = convert_for_display(build_sprite(shape, color, size, glow))
+            self.sprites[key] = sprite
+        return sprite
+
+    def rotation_frames(self, key, load_image):
+        # load_image is only called the first time a character is seen
+        frames = self.rotations.get(key)
+        if frames is None:
+            frames = self.rotations[key] = RotationFrames(load_image())
+        return frames
+
+    def obstacle(self, obstacle, glow=OBSTACLE_GLOW):
+        # glow=0 gives the plain sprite used at reduced quality
+        shape = SHAPE_TRIANGLE if obstacle.type == OBSTACLE_TRIANGLE else SHAPE_RECT
+        return self.get(shape, obstacle.color, (obstacle.width, obstacle.height), glow)
+
+    def shield(self):
+        size = SHIELD_RADIUS * 2
+        return self.get(SHAPE_CIRCLE, SHIELD_COLOR, (size, size), SHIELD_RADIUS)
+
+    def boost_glow(self):
+        size = BOOST_GLOW_RADIUS * 2
+        return self.get(SHAPE_CIRCLE, BOOST_GLOW_COLOR, (size, size), BOOST_GLOW_RADIUS)
+
+    def coin_glow(self, animation_angle):
+        glow_size = COIN_GLOW_SIZES[animation_angle // COIN_ANIMATION_STEP]
+        return self.get(SHAPE_CIRCLE, (*NEON_ORANGE, GLOW_ALPHA), COIN_GLOW_SURFACE, glow_size)
+
+    def preload(self):
+        # Build every sprite the game can ask for up front so no frame allocates
+        for color in NEON_COLORS:
+            for glow in (OBSTACLE_GLOW, 0):
+                self.get(SHAPE_TRIANGLE, color, (40, 40), glow)
+                self.get(SHAPE_RECT, color, (80, 30), glow)
+        self.shield()
+        self.boost_glow()
+        for angle in range(0, 360, COIN_ANIMATION_STEP):
+            self.coin_glow(angle)
+
+
+sprite_cache = SpriteCache()
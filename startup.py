@@ -0,0 +1,121 @@
+# Startup timing and background loading.
+#
+# The game shows its first frame before fonts, images and audio are ready:
+# each of those is handed to a BackgroundLoader, which runs the slow part
+# (file reads, decoding, opening the audio device) on worker threads and
+# delivers the results to ready-callbacks on the main thread when the game
+# loop calls poll(). Anything that touches the display (convert_alpha(),
+# blits) belongs in the callback, not in the load function. A load that
+# fails without its own error callback goes to the loader's on_error(name,
+# exception), which the game points at its telemetry.
+#
+# startup_report records how long every stage took, on which thread, relative
+# to when this module was first imported.
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LOADER_THREADS = 3
+
+
+class StartupReport:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = []  # (name, start_ms, duration_ms, thread name)
+        self.lock = threading.Lock()
+
+    def now_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    def add(self, name, start_ms, end_ms):
+        with self.lock:
+            self.stages.append((name, start_ms, end_ms - start_ms, threading.current_thread().name))
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def milestone(self, name):
+        # A zero-length stage, e.g. "first frame"
+        now = self.now_ms()
+        self.add(name, now, now)
+
+    def format(self):
+        width = max([len(stage[0]) for stage in self.stages] + [len("stage")]) + 2
+        lines = [f"{'stage':{width}s}{'start ms':>10s}{'ms':>9s}  thread"]
+        for name, start, duration, thread in sorted(self.stages, key=lambda stage: stage[1]):
+            lines.append(f"{name:{width}s}{start:10.1f}{duration:9.1f}  {thread}")
+        return "\n".join(lines)
+
+
+class Stage:
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.report.now_ms()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.report.add(self.name, self.start, self.report.now_ms())
+
+
+class BackgroundLoader:
+    def __init__(self, report=None, threads=LOADER_THREADS, on_error=None):
+        self.report = report
+        self.on_error = on_error
+        self.errors = []  # (name, exception) of loads that failed
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="loader")
+        self.ready = queue.Queue()  # (callback, result) pairs for the main thread
+        self.pending = 0
+
+    def submit(self, name, load, on_ready=None, on_error=None):
+        # load() runs on a worker thread; on_ready(result) or
+        # on_error(exception) run on the main thread from poll()
+        self.pending += 1
+        self.executor.submit(self.run, name, load, on_ready, on_error)
+
+    def run(self, name, load, on_ready, on_error):
+        start = self.report.now_ms() if self.report else 0
+        try:
+            result = load()
+        except Exception as e:
+            self.ready.put((on_error or self.default_error(name), e))
+        else:
+            self.ready.put((on_ready, result))
+        if self.report:
+            self.report.add(name, start, self.report.now_ms())
+
+    def default_error(self, name):
+        def report_error(e):
+            self.errors.append((name, e))
+            if self.on_error:
+                self.on_error(name, e)
+        return report_error
+
+    def poll(self):
+        # Deliver finished loads; returns True once nothing is pending
+        while self.pending:
+            try:
+                callback, result = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if callback:
+                callback(result)
+        return not self.pending
+
+    def wait(self):
+        # Block until every load has finished and its callback has run
+        while self.pending:
+            callback, result = self.ready.get()
+            self.pending -= 1
+            if callback:
+                callback(result)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+startup_report = StartupReport()
@@ -0,0 +1,102 @@
+# Structured gameplay telemetry, written off the game thread.
+#
+# emit() only appends a dict to a bounded in-memory buffer: no formatting, no
+# locks, no I/O, so a slow stdout pipe or disk can never stall a frame. A
+# background thread wakes every TELEMETRY_INTERVAL seconds (or as soon as a
+# batch has filled up), serialises everything buffered as NDJSON, one event
+# per line, and writes it with a single write() and flush().
+#
+# When the buffer is full, new events are dropped and counted rather than
+# waiting for the writer; the count is written as a "telemetry_dropped" event
+# whenever it changes.
+#
+#   {"type": "jump", "time": 1718000000.123, "tick": 412}
+#   {"type": "volume", "time": 1718000001.456, "volume": 1.0, "reason": "game_start"}
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+TELEMETRY_CAPACITY = 4096  # Events buffered before new ones are dropped
+TELEMETRY_BATCH = 256  # Wake the writer early once this many are waiting
+TELEMETRY_INTERVAL = 0.5  # Seconds between writes otherwise
+TELEMETRY_CLOSE_TIMEOUT = 2  # Seconds close() waits for the last write
+
+
+class Telemetry:
+    def __init__(self, path=None, capacity=TELEMETRY_CAPACITY, batch_size=TELEMETRY_BATCH,
+                 interval=TELEMETRY_INTERVAL):
+        # path None or "-" writes to stdout
+        if path is None or path == "-":
+            self.stream = sys.stdout
+            self.owns_stream = False
+        else:
+            self.stream = open(path, "a", encoding="utf-8")
+            self.owns_stream = True
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.interval = interval
+        # deque appends and pops from opposite ends are atomic, so the game
+        # thread and the writer share it without a lock
+        self.buffer = deque()
+        # Each counter has one writer: += is not atomic across threads
+        self.dropped = 0  # Game thread: buffer full
+        self.write_failures = 0  # Writer thread: events lost to a broken sink
+        self.reported_dropped = 0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def emit(self, kind, **fields):
+        buffer = self.buffer
+        if len(buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        event = {"type": kind, "time": time.time()}
+        event.update(fields)
+        buffer.append(event)
+        if len(buffer) >= self.batch_size:
+            self.wake.set()
+
+    def run(self):
+        while not self.stopping:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.write_batch()
+        # Whatever was emitted before close()
+        self.write_batch()
+
+    def write_batch(self):
+        buffer = self.buffer
+        lines = []
+        while buffer:
+            lines.append(json.dumps(buffer.popleft(), separators=(",", ":")))
+        events = len(lines)
+        dropped = self.dropped + self.write_failures
+        if dropped != self.reported_dropped:
+            lines.append(json.dumps({"type": "telemetry_dropped", "time": time.time(), "count": dropped},
+                                    separators=(",", ":")))
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Closed or broken sink: the events are lost, but counted, and the
+            # count goes out again with the next batch
+            self.write_failures += events
+            return
+        self.reported_dropped = dropped
+
+    def close(self):
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wake.set()
+        # A sink that blocks (a stalled pipe, a hung network mount) must not
+        # keep the game from quitting; the writer is a daemon thread
+        self.thread.join(TELEMETRY_CLOSE_TIMEOUT)
+        if self.owns_stream and not self.thread.is_alive():
+            self.stream.close()
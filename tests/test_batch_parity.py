@@ -0,0 +1,69 @@
+# BatchSimulation must stay bit-for-bit in sync with Simulation: every game is
+# stepped side by side with its own Simulation(seed) under the same jumps and
+# restarts, and the whole visible state is compared after every tick.
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import BatchSimulation
+from constants import NEON_COLORS
+from simulation import Simulation
+
+GAMES = 32
+TICKS = 3000
+
+
+def sim_state(sim):
+    player = sim.player
+    return (sim.tick, sim.score, sim.game_over, sim.game_active,
+            player.rect.y, player.prev_y, player.velocity_y, player.rotation,
+            player.jump_count, player.is_jumping, player.boost_active, player.shield_active,
+            player.score_multiplier,
+            [(o.rect.x, o.type, NEON_COLORS.index(o.color), o.passed) for o in sim.obstacles],
+            [(c.rect.x, c.rect.y, c.animation_angle) for c in sim.boost_items])
+
+
+def batch_state(batch, i):
+    coins = [slot % batch.max_coins for slot in range(batch.coin_head[i], batch.coin_tail[i])
+             if batch.coin_alive[i, slot % batch.max_coins]]
+    return (int(batch.tick[i]), int(batch.score[i]), bool(batch.game_over[i]), bool(batch.game_active[i]),
+            int(batch.player_y[i]), int(batch.prev_y[i]), int(batch.velocity_y[i]), int(batch.rotation[i]),
+            int(batch.jump_count[i]), bool(batch.is_jumping[i]), bool(batch.boost_active[i]),
+            bool(batch.shield_active[i]), int(batch.score_multiplier[i]),
+            [(int(batch.obstacle_x[i, k]), int(batch.obstacle_type[i, k]), int(batch.obstacle_color[i, k]),
+              bool(batch.obstacle_passed[i, k])) for k in batch.live_obstacle_slots(i)],
+            [(int(batch.coin_x[i, k]), int(batch.coin_y[i, k]), int(batch.coin_angle[i, k])) for k in coins])
+
+
+def test_batch_matches_simulation_tick_by_tick():
+    seeds = list(range(100, 100 + GAMES))
+    sims = [Simulation(seed) for seed in seeds]
+    batch = BatchSimulation(GAMES, seeds)
+    rng = random.Random(0)
+    for sim in sims:
+        sim.start()
+    batch.start()
+
+    restarts = 0
+    for tick in range(TICKS):
+        # Jump ahead of obstacles most of the time so runs last, and
+        # restart finished games now and then
+        jump = np.array([sim.game_active and (
+            any(0 < o.rect.x - sim.player.rect.right < 15 + rng.randint(0, 25) for o in sim.obstacles)
+            and rng.random() < 0.6 or rng.random() < 0.01) for sim in sims])
+        restart = np.array([sim.game_over and rng.random() < 0.05 for sim in sims])
+        for i, sim in enumerate(sims):
+            if restart[i]:
+                sim.reset()
+                restarts += 1
+        batch.reset(restart)
+        for i, sim in enumerate(sims):
+            sim.step(bool(jump[i]))
+        batch.step(jump)
+        for i, sim in enumerate(sims):
+            assert batch_state(batch, i) == sim_state(sim), f"game {i} diverged at tick {tick}"
+
+    # The schedule has to exercise deaths and restarts to mean anything
+    assert restarts > 0
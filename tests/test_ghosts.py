@@ -0,0 +1,65 @@
+# A ghost track covers every tick of its run, including the tick the run
+# ended on, whether it ended by death or by finishing a level.
+from constants import EVENT_DEATH, EVENT_LEVEL_COMPLETE
+from ghosts import load_ghosts, tracks_from_log
+from level import LevelFile, write_level
+from replay import InputRecorder
+from simulation import Simulation
+
+
+def record(sim, ticks, jump_every=0):
+    recorder = InputRecorder(sim)
+    sim.start()
+    recorder.start()
+    positions = []
+    for tick in range(ticks):
+        jump = bool(jump_every) and tick % jump_every == 0
+        if jump:
+            recorder.jump()
+        sim.step(jump)
+        positions.append((sim.distance, sim.player.rect.y))
+        if sim.game_over:
+            break
+    return recorder.finish(), positions
+
+
+def check_track(log, positions, level=None):
+    (track,) = tracks_from_log(log, level)
+    assert len(track) == len(positions)
+    assert list(zip(track.distance, track.y)) == positions
+
+
+def test_track_ends_on_death():
+    sim = Simulation(3)
+    log, positions = record(sim, 10000)
+    assert EVENT_DEATH in sim.events
+    check_track(log, positions)
+
+
+def test_track_ends_on_level_complete(tmp_path):
+    # Nothing to hit: the run ends when the single coin has scrolled past
+    path = tmp_path / "level.cdlv"
+    write_level(path, [], [(900, 200)])
+    level = LevelFile(path)
+    sim = Simulation(3, level=level)
+    log, positions = record(sim, 10000)
+    assert EVENT_LEVEL_COMPLETE in sim.events
+    check_track(log, positions, level)
+
+
+def test_bad_logs_are_skipped(tmp_path):
+    # A log from random mode doesn't replay on the level, and the garbage and
+    # missing files can't be read; the good log still becomes a ghost
+    path = tmp_path / "level.cdlv"
+    write_level(path, [], [(900, 200)])
+    level = LevelFile(path)
+    good, positions = record(Simulation(3, level=level), 10000)
+    random_mode, _ = record(Simulation(3), 2000, jump_every=40)
+    good.save(tmp_path / "good.cdr")
+    random_mode.save(tmp_path / "random.cdr")
+    (tmp_path / "garbage.cdr").write_bytes(b"not a log")
+    paths = [str(tmp_path / name) for name in ("garbage.cdr", "random.cdr", "good.cdr", "missing.cdr")]
+
+    race = load_ghosts(paths, level)
+    assert [list(track.y) for track in race.tracks] == [[y for _, y in positions]]
+    assert [path for path, _ in race.skipped] == paths[:2] + paths[3:]
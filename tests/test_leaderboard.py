@@ -0,0 +1,81 @@
+# Leaderboard client against the in-memory stand-in server, plus the parts
+# that must hold up against a misbehaving one.
+import json
+import threading
+import time
+
+import pytest
+
+from leaderboard import Leaderboard, board_entries, serve
+
+
+@pytest.fixture
+def server():
+    server = serve(0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_runs_are_submitted_and_board_cached(server, tmp_path):
+    board_path = tmp_path / "board.json"
+    client = Leaderboard(server, "kiosk", str(tmp_path / "queue.ndjson"), str(board_path))
+    try:
+        for score in (5, 50, 20):
+            client.record(score, 1, 2.5)
+        assert wait_for(lambda: client.submitted == 3 and len(client.top()) == 3)
+        assert [entry["score"] for entry in client.top()] == [50, 20, 5]
+        assert wait_for(board_path.exists)
+    finally:
+        client.close()
+    assert (tmp_path / "queue.ndjson").read_text() == ""
+
+
+def test_runs_queue_on_disk_while_offline(tmp_path):
+    queue_path = str(tmp_path / "queue.ndjson")
+    # Nothing listens on port 9 (discard) here
+    client = Leaderboard("http://127.0.0.1:9", "kiosk", queue_path, str(tmp_path / "board.json"))
+    try:
+        client.record(7, 1, 1.0)
+        assert wait_for(lambda: client.failures > 0)
+    finally:
+        client.close()
+    with open(queue_path) as f:
+        assert [json.loads(line)["score"] for line in f] == [7]
+
+
+def test_malformed_board_entries_are_dropped(tmp_path):
+    entries = [{"name": "a", "score": 3}, "junk", None, {"name": "b"}, {"score": 4},
+               {"name": 5, "score": 1}, {"name": "c", "score": "9"}, {"name": "d", "score": True}]
+    assert board_entries(entries) == [{"name": "a", "score": 3}]
+
+    # A poisoned cache file from an earlier version doesn't survive loading
+    board_path = tmp_path / "board.json"
+    board_path.write_text(json.dumps(entries))
+    client = Leaderboard("http://127.0.0.1:9", "kiosk", str(tmp_path / "queue.ndjson"), str(board_path))
+    try:
+        assert client.top() == [{"name": "a", "score": 3}]
+    finally:
+        client.close()
+
+
+def test_retry_after_is_jittered(tmp_path):
+    client = Leaderboard("http://127.0.0.1:9", "kiosk", str(tmp_path / "queue.ndjson"),
+                         str(tmp_path / "board.json"))
+    client.close()
+    delays = set()
+    for _ in range(20):
+        now = time.monotonic()
+        client.back_off("10")
+        delay = client.retry_at - now
+        assert 10 <= delay <= 15.1
+        delays.add(round(delay, 3))
+    assert len(delays) > 1
@@ -0,0 +1,83 @@
+# Level files and text levels that are damaged or out of range are rejected
+# with a LevelError, never a struct or mmap error.
+import pytest
+
+from constants import OBSTACLE_TRIANGLE
+from level import (LEVEL_HEADER, LEVEL_MAX_X, LEVEL_RECORD, LevelError, LevelFile, LevelStream, level_bytes,
+                   parse_level_text)
+from simulation import Simulation
+
+
+def write(tmp_path, data):
+    path = tmp_path / "level.cdlv"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    obstacles, coins = parse_level_text("triangle 900 2\nplatform 1400\ncoin 3000 300  # late coin\n")
+    level = LevelFile(write(tmp_path, level_bytes(obstacles, coins, chunk_width=1024)))
+    records = LevelStream(level).take(10 ** 6)
+    assert [record[0] for record in records] == [900, 1400, 3000]
+    level.close()
+
+
+@pytest.mark.parametrize("size", [0, 10, 40, -1])
+def test_truncated_file(tmp_path, size):
+    obstacles, coins = parse_level_text("triangle 900\ncoin 3000 300\n")
+    data = level_bytes(obstacles, coins)
+    with pytest.raises(LevelError):
+        LevelFile(write(tmp_path, data[:size]))
+
+
+def test_index_past_records(tmp_path):
+    obstacles, coins = parse_level_text("triangle 900\n")
+    data = level_bytes(obstacles, coins)
+    magic, version, chunk_width, chunk_count, record_count, length = LEVEL_HEADER.unpack_from(data)
+    # The index still points at the one record the header no longer counts
+    header = LEVEL_HEADER.pack(magic, version, chunk_width, chunk_count, 0, length)
+    with pytest.raises(LevelError):
+        LevelFile(write(tmp_path, header + data[LEVEL_HEADER.size:]))
+
+
+@pytest.mark.parametrize("line", [
+    "triangle -1",
+    f"platform {LEVEL_MAX_X + 1}",
+    "coin -40 300",
+    "coin 900 -1",
+    "coin 900 70000",
+    "triangle 900 99",
+    "square 900",
+    "coin 900",
+])
+def test_bad_text_line(line):
+    with pytest.raises(LevelError, match="Line 2"):
+        parse_level_text(f"triangle 500\n{line}\n")
+
+
+# (kind, width, height, color) no Simulation can spawn
+BAD_RECORDS = [(OBSTACLE_TRIANGLE, 40, 40, 9), (7, 40, 40, 0), (OBSTACLE_TRIANGLE, 0, 40, 0)]
+BAD_RECORD_IDS = ["color", "kind", "size"]
+
+
+@pytest.mark.parametrize("kind, width, height, color", BAD_RECORDS, ids=BAD_RECORD_IDS)
+def test_bad_record_is_not_written(kind, width, height, color):
+    with pytest.raises(LevelError):
+        level_bytes([(900, kind, width, height, color)], [])
+
+
+@pytest.mark.parametrize("kind, width, height, color", BAD_RECORDS, ids=BAD_RECORD_IDS)
+def test_bad_record_is_not_loaded(tmp_path, kind, width, height, color):
+    # A good level in a later chunk, with its one record overwritten
+    obstacles, coins = parse_level_text("triangle 5000\n")
+    data = bytearray(level_bytes(obstacles, coins, chunk_width=1024))
+    LEVEL_RECORD.pack_into(data, len(data) - LEVEL_RECORD.size, 5000, kind, width, height, color, 0)
+    level = LevelFile(write(tmp_path, bytes(data)))
+    # Raised by the Simulation once the record's chunk is decoded, not as an
+    # IndexError or a bogus obstacle when it spawns
+    with pytest.raises(LevelError, match="x 5000"):
+        sim = Simulation(1, level=level)
+        sim.start()
+        for _ in range(2000):
+            sim.step(False)
+    level.close()
@@ -0,0 +1,66 @@
+# Record -> save -> replay must reproduce a live run exactly. The recording
+# side drives a Simulation the way Game does: inputs are recorded at the tick
+# they apply from, and time stands still while the game is over.
+import random
+
+import pytest
+
+from replay import INPUT_RESTART, InputLog, InputRecorder, ReplayError, replay, verify
+from simulation import Simulation
+
+
+def record_run(seed, precise_collision, ticks=20000):
+    rng = random.Random(seed)
+    sim = Simulation(seed, precise_collision)
+    recorder = InputRecorder(sim)
+    for frame in range(ticks):
+        if frame == 10 and sim.start():
+            recorder.start()
+        if sim.game_over:
+            if rng.random() < 0.1:
+                recorder.restart()
+                sim.reset()
+            continue
+        jump = (sim.game_active
+                and any(0 < o.rect.x - sim.player.rect.right < 25 + rng.randint(0, 10) for o in sim.obstacles)
+                and rng.random() < 0.5)
+        if jump:
+            recorder.jump()
+        sim.step(jump)
+    return sim, recorder.finish()
+
+
+def state(sim):
+    return (sim.tick, sim.score, sim.game_over, tuple(sim.player.rect),
+            [tuple(o.rect) for o in sim.obstacles], [tuple(b.rect) for b in sim.boost_items])
+
+
+@pytest.mark.parametrize("precise_collision", [False, True])
+def test_replay_reproduces_recorded_run(tmp_path, precise_collision):
+    live, log = record_run(1234, precise_collision)
+    path = tmp_path / "run.cdr"
+    log.save(path)
+    loaded = InputLog.load(path)
+    assert loaded.precise_collision == precise_collision
+    assert loaded.inputs == log.inputs
+
+    # The schedule has to include restarts to cover them
+    assert sum(1 for _, kind in log.inputs if kind == INPUT_RESTART) > 1
+    assert state(replay(loaded)) == state(live)
+    assert verify(loaded)
+    assert not verify(loaded, live.score + 1)
+
+
+def test_replay_rejects_inputs_after_a_death():
+    # Dropping a restart leaves the following inputs in a finished game
+    _, log = record_run(5, False)
+    restart = next(i for i, (_, kind) in enumerate(log.inputs) if kind == INPUT_RESTART)
+    del log.inputs[restart]
+    with pytest.raises(ReplayError):
+        replay(InputLog.from_bytes(log.to_bytes()))
+
+
+def test_truncated_log_is_rejected():
+    _, log = record_run(5, False, ticks=2000)
+    with pytest.raises(ReplayError):
+        InputLog.from_bytes(log.to_bytes()[:5])
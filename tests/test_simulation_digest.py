@@ -0,0 +1,73 @@
+# Refactors of the simulation core must not change gameplay. A fixed set of
+# seeds is played with a fixed jump schedule and every tick's state is
+# hashed; the expected digest was recorded before the pooling and broad-phase
+# changes and must never move unless gameplay is changed on purpose.
+import hashlib
+import random
+
+from simulation import Simulation
+
+# 40 seeds x 6000 ticks, classic collision
+TRAJECTORY_DIGEST = "c016c33d0f997bfb72c21d29ac5ab1c644c52e3c"
+TRAJECTORY_SCORE = 2021
+# Full Simulation.snapshot() every 100 ticks, 10 seeds x 6000 ticks, in both
+# collision modes; these also cover the broad-phase window's widening for
+# the rotated player in precise mode
+SNAPSHOT_DIGEST_CLASSIC = "90cd01a89860a497fee8fd699e4aa53c4960b2bb"
+SNAPSHOT_DIGEST_PRECISE = "b011a9c2290f93f29f18b1bf248912850160d3d5"
+
+
+def play(seed, ticks, sim, on_tick):
+    # Jump shortly before obstacles most of the time, plus the odd random
+    # jump; restart straight after every death
+    rng = random.Random(seed)
+    total = 0
+    sim.start()
+    for _ in range(ticks):
+        jump = (sim.game_active
+                and any(0 < o.rect.x - sim.player.rect.right < 20 + rng.randint(0, 20) for o in sim.obstacles)
+                and rng.random() < 0.6)
+        if rng.random() < 0.01:
+            jump = True
+        sim.step(jump)
+        if sim.game_over:
+            total += sim.score
+            sim.reset()
+        on_tick(sim)
+    return total
+
+
+def test_trajectory_digest():
+    digest = hashlib.sha1()
+
+    def on_tick(sim):
+        player = sim.player
+        digest.update(repr((sim.tick, sim.score, tuple(player.rect), player.velocity_y, player.rotation,
+                            player.shield_active,
+                            [(tuple(o.rect), o.type, o.color, o.passed) for o in sim.obstacles],
+                            [tuple(b.rect) for b in sim.boost_items], sim.events)).encode())
+
+    total = sum(play(seed, 6000, Simulation(seed), on_tick) for seed in range(40))
+    assert (digest.hexdigest(), total) == (TRAJECTORY_DIGEST, TRAJECTORY_SCORE)
+
+
+def snapshot_digest(precise_collision):
+    # Everything step() reads or writes, every 100 ticks, for 10 seeds
+    digest = hashlib.sha1()
+    for seed in range(10):
+        sim = Simulation(seed, precise_collision)
+
+        def on_tick(sim):
+            if sim.tick % 100 == 0:
+                digest.update(repr(sim.snapshot()).encode())
+
+        play(seed, 6000, sim, on_tick)
+    return digest.hexdigest()
+
+
+def test_snapshot_digest_classic():
+    assert snapshot_digest(False) == SNAPSHOT_DIGEST_CLASSIC
+
+
+def test_snapshot_digest_precise():
+    assert snapshot_digest(True) == SNAPSHOT_DIGEST_PRECISE
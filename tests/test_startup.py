@@ -0,0 +1,17 @@
+# Loads that fail without their own error callback reach the loader's
+# on_error, on the thread that polls, instead of being printed.
+import threading
+
+from startup import BackgroundLoader
+
+
+def test_failed_load_goes_to_on_error():
+    seen = []
+    loader = BackgroundLoader(on_error=lambda name, e: seen.append((name, type(e), threading.current_thread())))
+    loader.submit("broken", lambda: 1 / 0)
+    loader.submit("fine", lambda: 1, lambda result: seen.append(("fine", result)))
+    loader.wait()
+    loader.shutdown()
+    assert ("broken", ZeroDivisionError, threading.current_thread()) in seen
+    assert ("fine", 1) in seen
+    assert [name for name, _ in loader.errors] == ["broken"]
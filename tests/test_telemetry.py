@@ -0,0 +1,66 @@
+# close() writes what was emitted, and gives up on a sink that blocks.
+import io
+import json
+import threading
+import time
+
+import telemetry
+from telemetry import Telemetry
+
+
+def test_close_writes_pending_events(tmp_path):
+    path = tmp_path / "events.ndjson"
+    sink = Telemetry(str(path), interval=60)
+    sink.emit("jump", tick=3)
+    sink.close()
+    (event,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert event["type"] == "jump" and event["tick"] == 3
+
+
+class StuckStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait()
+        return super().write(text)
+
+
+def test_close_does_not_wait_for_a_stuck_sink(monkeypatch):
+    monkeypatch.setattr(telemetry, "TELEMETRY_CLOSE_TIMEOUT", 0.2)
+    sink = Telemetry(interval=0.01)
+    stream = sink.stream = StuckStream()
+    sink.emit("jump", tick=1)
+    time.sleep(0.1)
+    start = time.perf_counter()
+    sink.close()
+    assert time.perf_counter() - start < 1
+    stream.release.set()
+
+
+class FlakyStream(io.StringIO):
+    # Fails the first write, then works
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    def write(self, text):
+        if not self.failed:
+            self.failed = True
+            raise OSError("disk full")
+        return super().write(text)
+
+
+def test_dropped_counts_full_buffer_and_failed_writes():
+    sink = Telemetry(capacity=2, interval=60)
+    stream = sink.stream = FlakyStream()
+    for tick in range(3):
+        sink.emit("jump", tick=tick)
+    # Two buffered events are lost to the failed write, one to the full buffer
+    sink.write_batch()
+    sink.emit("jump", tick=3)
+    sink.close()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["type"] for event in events] == ["jump", "telemetry_dropped"]
+    assert events[1]["count"] == 3
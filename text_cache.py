@@ -0,0 +1,86 @@
+# Cached text rendering for the HUD, menus and coin labels.
+#
+# Font.render() re-shapes and rasterises a string every call. Static strings
+# are kept in a bounded LRU cache keyed by (font, text, color); numbers that
+# change every frame (score, boost countdown) are assembled from a digit atlas
+# of pre-rendered glyphs instead of being rendered as new strings.
+from collections import OrderedDict
+
+TEXT_CACHE_SIZE = 64
+
+
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                # Evict the least recently used string
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def digits(self, font, color):
+        key = (font, color)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = self.atlases[key] = DigitAtlas(font, color)
+        return atlas
+
+    def draw(self, surface, font, text, color, **anchor):
+        # Blit cached text positioned like Surface.get_rect(**anchor)
+        text_surface = self.render(font, text, color)
+        rect = text_surface.get_rect(**anchor)
+        surface.blit(text_surface, rect)
+        return rect
+
+    def number_rect(self, font, color, prefix, number, suffix="", **anchor):
+        # Rect that draw_number() would fill, positioned like get_rect(**anchor)
+        width = self.render(font, prefix, color).get_width()
+        width += self.digits(font, color).width(str(number))
+        if suffix:
+            width += self.render(font, suffix, color).get_width()
+        rect = self.render(font, prefix, color).get_rect()
+        rect.width = width
+        for name, value in anchor.items():
+            setattr(rect, name, value)
+        return rect
+
+    def draw_number(self, surface, font, color, prefix, number, suffix="", **anchor):
+        # Draw prefix + number + suffix, with the number built from the digit atlas
+        rect = self.number_rect(font, color, prefix, number, suffix, **anchor)
+        prefix_surface = self.render(font, prefix, color)
+        surface.blit(prefix_surface, rect.topleft)
+        x = self.digits(font, color).draw(surface, str(number), rect.x + prefix_surface.get_width(), rect.y)
+        if suffix:
+            surface.blit(self.render(font, suffix, color), (x, rect.y))
+        return rect
+
+
+class DigitAtlas:
+    def __init__(self, font, color):
+        self.glyphs = {}
+        for digit in "-0123456789":
+            self.glyphs[digit] = font.render(digit, True, color)
+
+    def width(self, digits):
+        return sum(self.glyphs[digit].get_width() for digit in digits)
+
+    def draw(self, surface, digits, x, y):
+        # Returns the x position just past the last digit
+        for digit in digits:
+            glyph = self.glyphs[digit]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+
+text_cache = TextCache()
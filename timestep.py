@@ -0,0 +1,45 @@
+# Fixed-timestep clock that decouples simulation ticks from the render rate.
+#
+# The front end feeds it real elapsed time each frame; it answers how many
+# simulation ticks to run and how far between the last two ticks the frame
+# should be drawn (the interpolation alpha).
+from constants import TICK_MS, MAX_TICKS_PER_FRAME
+
+
+class FixedTimestep:
+    def __init__(self, tick_ms=TICK_MS, max_ticks_per_frame=MAX_TICKS_PER_FRAME):
+        self.tick_ms = tick_ms
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        # Bank the real time that passed and pay it out in whole ticks
+        self.accumulator += elapsed_ms
+        ticks = int(self.accumulator // self.tick_ms)
+        if ticks > self.max_ticks_per_frame:
+            # After a long hitch, slow the game down instead of fast-forwarding
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_ms
+        return ticks
+
+    @property
+    def alpha(self):
+        # Fraction of a tick left in the accumulator, 0 <= alpha < 1
+        return min(self.accumulator / self.tick_ms, 1.0)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+def lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
+
+
+def lerp_angle(previous, current, alpha):
+    # Take the short way round when the rotation wraps (e.g. -270 -> 0)
+    delta = (current - previous) % 360
+    if delta > 180:
+        delta -= 360
+    return previous + delta * alpha